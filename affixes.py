@@ -0,0 +1,145 @@
+#
+#  affixes.py
+#
+from functools import lru_cache
+from collections import namedtuple
+
+from translations import translation_dictionary
+from util import remove_all_except
+
+
+class AffixTrie:
+    """Finds which prefix (or suffix) out of a set of them a word has, by walking the word one character at a time.
+
+    If a word has more than one of the affixes, the one that was added first wins.
+    """
+
+    def __init__(self, affixes=(), suffixes=False):
+        """
+        :param affixes: An iterable of `(affix, value)` pairs, highest priority first.
+        :param suffixes: Match the end of words instead of the start.
+        """
+        self.suffixes = suffixes
+        self.root = {}
+        self.size = 0
+
+        for affix, value in affixes:
+            self.add(affix, value)
+
+    def add(self, affix, value, priority=None):
+        """Add an affix, by default it has a lower priority than every affix added before it."""
+        if priority is None:
+            priority = self.size
+
+        node = self.root
+        for character in (reversed(affix) if self.suffixes else affix):
+            node = node.setdefault(character, {})
+
+        if None not in node:
+            node[None] = (priority, affix, value)
+            self.size += 1
+
+    def match(self, word):
+        """Returns `(affix, value)` for the affix `word` has, or `None`."""
+        best = None
+        node = self.root
+        for character in (reversed(word) if self.suffixes else word):
+            node = node.get(character)
+            if node is None:
+                break
+            if None in node and (best is None or node[None][0] < best[0]):
+                best = node[None]
+
+        return best[1:] if best else None
+
+
+# Everything the affixes of a gorgus word tell us.
+# `stem` is the word without its tense, plural, actor and diacritics, `root` is the stem without its word type suffix too.
+# `diacritics` has one `(diacritic, word after removing it, english word, intensity, description)` tuple for every diacritic.
+GorgusWordAnalysis = namedtuple("GorgusWordAnalysis", ["stem", "root", "tense", "tense_suffix", "plural", "actor", "diacritics", "word_type_suffix", "prefixes", "suffixes"])
+
+TENSE_SUFFIXES = AffixTrie([
+    (translation_dictionary["<CONT_TENSE>"], "cont"),
+    (translation_dictionary["<PAST_TENSE>"], "past"),
+    (translation_dictionary["<FUTR_TENSE>"], "futr")
+], suffixes=True)
+
+PLURAL_PREFIX = translation_dictionary["<PLURAL>"]
+ACTOR_SUFFIX = translation_dictionary["<ACTOR>"]
+
+# diacritic -> (english word, intensity, description), in the order they get checked
+DIACRITICS = {
+    translation_dictionary["<EXAGGERATED_VERB>"]: ("really", "high", "diacritic for intensified form"),
+    translation_dictionary["<GENTLE_VERB>"]: ("slightly", "low", "diacritic for reduced intensity form"),
+    translation_dictionary["<MORE_VERB>"]: ("more", "more", "diacritic for intensified comparative form"),
+    translation_dictionary["<LESS_VERB>"]: ("less", "less", "diacritic for reduced intensity comparative form")
+}
+# a word can only have a diacritic in it if it has the diacritic's first character in it, even if a diacritic is more than one character
+DIACRITIC_FIRST_CHARACTERS = frozenset(diacritic[0] for diacritic in DIACRITICS)
+
+# words can end with either the accented or unaccented version of a word type suffix
+WORD_TYPE_SUFFIXES = AffixTrie(suffixes=True)
+for priority, word_type_suffix in enumerate([
+    translation_dictionary["<VERB>"],
+    translation_dictionary["<NOUN>"],
+    translation_dictionary["<ADJECTIVE>"],
+    translation_dictionary["<ADVERB>"],
+    translation_dictionary["<ADPOSITION>"]
+]):
+    WORD_TYPE_SUFFIXES.add(word_type_suffix, word_type_suffix, priority)
+    WORD_TYPE_SUFFIXES.add(remove_all_except(word_type_suffix), word_type_suffix, priority)
+
+
+@lru_cache(maxsize=8192)
+def analyze_gorgus_word(word):
+    """Split a gorgus word (without punctuation) into its root and affixes.
+
+    Affixes are removed in this order: tense suffix, plural prefix, actor suffix, diacritics
+    and then the word type suffix. The word type suffix is left alone if the stem is "ji".
+    """
+    tense = "norm"
+    tense_suffix = None
+    plural = False
+    actor = False
+
+    # the suffixes and prefixes lists are used by the inspector
+    prefixes = []
+    suffixes = []
+
+    match = TENSE_SUFFIXES.match(word)
+    if match:
+        tense_suffix, tense = match
+        word = word.removesuffix(tense_suffix)
+        suffixes.append(tense_suffix)
+
+    if word.startswith(PLURAL_PREFIX):
+        word = word.removeprefix(PLURAL_PREFIX)
+        prefixes.append(PLURAL_PREFIX)
+        plural = True
+
+    if word.endswith(ACTOR_SUFFIX):
+        word = word.removesuffix(ACTOR_SUFFIX)
+        suffixes.append(ACTOR_SUFFIX)
+        actor = True
+
+    diacritics = []
+    if not DIACRITIC_FIRST_CHARACTERS.isdisjoint(word):
+        for diacritic, (english, intensity, description) in DIACRITICS.items():
+            if diacritic in word:
+                word = word.replace(diacritic, "")
+                diacritics.append((diacritic, word, english, intensity, description))
+
+    stem = word
+    word_type_suffix = None
+    if stem != "ji":
+        match = WORD_TYPE_SUFFIXES.match(word)
+        if match:
+            word_type_suffix = match[1]
+            word = word.removesuffix(word_type_suffix).removesuffix(remove_all_except(word_type_suffix))
+
+            if len(suffixes) > 0: # we need to move the most recent suffix before the formality suffix in suffixes list for the inspect tool
+                suffixes.insert(len(suffixes) - 1, word_type_suffix)
+            else:
+                suffixes.append(word_type_suffix)
+
+    return GorgusWordAnalysis(stem, word, tense, tense_suffix, plural, actor, tuple(diacritics), word_type_suffix, tuple(prefixes), tuple(suffixes))
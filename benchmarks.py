@@ -0,0 +1,501 @@
+#
+#  benchmarks.py
+#
+"""Benchmarks for the slow parts of the translator.
+
+Run `python benchmarks.py` to run all of them, or `python benchmarks.py phrases` to only run one.
+The full benchmark suite (with latency percentiles, JSON results and regression checks) is run with `python translater.py benchmark`.
+"""
+import io
+import re
+import sys
+import json
+import math
+import random
+import platform
+from time import perf_counter
+from argparse import Namespace
+
+from rich.console import Console
+from rich.table import Table, Column
+from rich import box
+
+console = Console()
+
+SENTENCES = [
+    "Hi! How are you?",
+    "What is going on?",
+    "I am going to eat some food with you, don't forget to remember the apocalypse.",
+    "Thank you, I hope you have a really nice day.",
+    "Can I go to the shop? I won't be long, I'm not going to buy everything.",
+    "The quick brown fox jumped over the lazy fat cat.",
+    "How old are you? You look like a person who is about to leave me alone.",
+    "For the love of god, shut up and stop speaking, you are being very loud.",
+]
+
+
+def time_per_call(function, inputs, repeats=5):
+    """Returns the best average time (in seconds) it took to call `function` on every input."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = perf_counter()
+        for item in inputs:
+            function(item)
+        best = min(best, (perf_counter() - start) / len(inputs))
+    return best
+
+
+#region Phrase matching
+def sort_phrases(phrases):
+    return sorted(
+        phrases.items(),
+        key=lambda item: max(len(p) for p in (item[1] if isinstance(item[1], list) else [item[1]])),
+        reverse=True
+    )
+
+
+def count_phrases(phrases):
+    """How many english phrases a phrase table has, counting every alternative."""
+    return sum(len(p) if isinstance(p, list) else 1 for p in phrases.values())
+
+def grow_phrase_table(phrases, factor, seed=0):
+    """Make a fake phrase table with `factor` times as many english phrases, by adding made up phrases that look like the real ones."""
+    rng = random.Random(seed)
+    words = sorted({word for p in phrases.values() for alt in (p if isinstance(p, list) else [p]) for word in alt.split()})
+
+    grown = dict(phrases)
+    phrase_count = count_phrases(phrases)
+    target = phrase_count * factor
+    while phrase_count < target:
+        phrase_count += 1
+        fake_phrase = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 4))) + f" zq{len(grown)}"
+        grown[f"fake{len(grown)}"] = fake_phrase
+    return grown
+
+
+def regex_phrase_replace(sorted_phrases, text):
+    """The old way `to_gorgus` replaced phrases, one `re.sub` per phrase."""
+    for gorgus, english_phrases in sorted_phrases:
+        if isinstance(english_phrases, str):
+            english_phrases = [english_phrases]
+        for phrase in english_phrases:
+            pattern = r'\b' + re.escape(phrase) + r'\b'
+            text = re.sub(pattern, gorgus, text, flags=re.IGNORECASE)
+    return text
+
+
+def bench_phrases():
+    from phrase_matcher import PhraseMatcher
+    from translations import phrase_translations
+
+    sentences = [s.lower() for s in SENTENCES]
+
+    table = Table("Phrase table", "Phrases", "re.sub per phrase", "PhraseMatcher", title="Phrase replacement (per sentence)", box=box.ROUNDED)
+    for factor in [1, 10]:
+        phrases = grow_phrase_table(phrase_translations, factor)
+        sorted_phrases = sort_phrases(phrases)
+        matcher = PhraseMatcher(
+            (phrase, gorgus)
+            for gorgus, english_phrases in sorted_phrases
+            for phrase in sorted(english_phrases if isinstance(english_phrases, list) else [english_phrases], key=len, reverse=True)
+        )
+
+        regex_time = time_per_call(lambda s: regex_phrase_replace(sorted_phrases, s), sentences)
+        matcher_time = time_per_call(matcher.replace, sentences)
+
+        table.add_row(f"{factor}x", str(len(matcher)), f"{regex_time * 1e6:.1f}µs", f"{matcher_time * 1e6:.1f}µs")
+
+    console.print(table)
+
+
+def legacy_gorgus_phrase_replace(text):
+    """The old way `from_gorgus` replaced phrases, deaccenting every phrase and calling `str.replace` for every alternative."""
+    from translations import phrase_translations
+    from util import remove_all_except
+
+    for gorgus, english in phrase_translations.items():
+        if type(english) == list:
+            for phrase in english:
+                text = text.replace(remove_all_except(gorgus), english[0])
+        elif type(english) == str:
+            text = text.replace(remove_all_except(gorgus), english)
+    return text
+
+
+def bench_gorgus_phrases():
+    import translater
+    from translations import translation_dictionary
+    from util import remove_all_except
+
+    translater.translator.warm_up()
+    gorgus_phrase_matcher = translater.gorgus_phrase_matcher
+
+    rng = random.Random(0)
+    words = [remove_all_except(word) for word in translation_dictionary if not word.startswith("<")]
+
+    table = Table("Input size", "str.replace per phrase", "PhraseMatcher", title="Gorgus phrase replacement", box=box.ROUNDED)
+    for size in [100, 1_000, 10_000, 100_000]:
+        text = ' '.join(rng.choice(words) for _ in range(size // 7))
+        assert legacy_gorgus_phrase_replace(text) == gorgus_phrase_matcher.replace(text)
+
+        legacy_time = time_per_call(legacy_gorgus_phrase_replace, [text])
+        matcher_time = time_per_call(gorgus_phrase_matcher.replace, [text])
+        table.add_row(f"{size:,} chars", f"{legacy_time * 1e3:.2f}ms", f"{matcher_time * 1e3:.2f}ms")
+
+    console.print(table)
+#endregion
+
+
+#region IPA
+def legacy_ipa_pronounciation(gorgus):
+    """The old `get_ipa_pronounciation`, which rebuilt and re-sorted the rules for every word."""
+    from ipa import IPA_CONSONANTS, create_ipa_dict
+
+    consonants = {ipa: list(romanizations) for ipa, romanizations in IPA_CONSONANTS.items()}
+    ipa_dict = create_ipa_dict(consonants)
+
+    gorgus = gorgus.replace(",", " |").replace(".", " ‖").replace("!", " ‖")
+    gorgus = gorgus.translate(str.maketrans('', '', "?!\":()=/\\$[]"))
+    gorgus = gorgus.lower().replace("-", "").replace("'", ".")
+
+    ipa_output = []
+    for word in gorgus.split():
+        ipa_word = word
+        for roman, ipa in sorted(ipa_dict.items(), key=lambda x: -len(x[0])):
+            ipa_word = ipa_word.replace(roman, ipa)
+        ipa_output.append(ipa_word)
+
+    return "/" + ' '.join(ipa_output).replace("R", "r").replace("O", "o") + "/"
+
+
+def bench_ipa():
+    from ipa import get_ipa_pronounciation, get_ipa_word
+    from translations import translation_dictionary, phrase_translations
+
+    words = [word for word in list(translation_dictionary) + list(phrase_translations) if not word.startswith("<")]
+
+    mismatches = [word for word in words if legacy_ipa_pronounciation(word) != get_ipa_pronounciation(word)]
+
+    legacy_time = time_per_call(legacy_ipa_pronounciation, words)
+
+    def cold(word):
+        get_ipa_word.cache_clear()
+        return get_ipa_pronounciation(word)
+
+    cold_time = time_per_call(cold, words)
+    warm_time = time_per_call(get_ipa_pronounciation, words)
+
+    table = Table("Version", "Time per word", title=f"IPA over the full dictionary ({len(words)} words)", box=box.ROUNDED)
+    table.add_row("old get_ipa_pronounciation", f"{legacy_time * 1e6:.1f}µs")
+    table.add_row("compiled rules (cold cache)", f"{cold_time * 1e6:.1f}µs")
+    table.add_row("compiled rules (warm cache)", f"{warm_time * 1e6:.1f}µs")
+    console.print(table)
+
+    if mismatches:
+        console.print(f"[red]{len(mismatches)} words have a different pronounciation![/red] {', '.join(mismatches[:10])}")
+    else:
+        console.print("[green]Output is identical for every word.[/green]")
+#endregion
+
+
+#region Batch translation
+def bench_batch():
+    import translater
+
+    translater.translator.warm_up()
+
+    # lots of the same short strings over and over again, like the text in an app's UI
+    rng = random.Random(0)
+    texts = [rng.choice(SENTENCES) for _ in range(1000)]
+
+    def one_by_one(texts):
+        return [translater.translate(text, "gorgus") for text in texts]
+
+    one_by_one_time = time_per_call(one_by_one, [texts], repeats=3)
+    many_time = time_per_call(lambda texts: translater.translate_many(texts, "gorgus"), [texts], repeats=3)
+
+    table = Table("Version", "Time for 1000 texts", title=f"Batch translation ({len(set(texts))} different texts)", box=box.ROUNDED)
+    table.add_row("translate() in a loop", f"{one_by_one_time * 1e3:.1f}ms")
+    table.add_row("translate_many()", f"{many_time * 1e3:.1f}ms")
+    console.print(table)
+
+
+def bench_scaling():
+    import os
+    import translater
+    from translations import translation_dictionary
+
+    translater.translator.warm_up()
+
+    # every text is different, so this is all translating and no deduplicating
+    rng = random.Random(0)
+    words = sorted({english for value in translation_dictionary.values() for english in (value if isinstance(value, list) else [value]) if english.isalpha()})
+    texts = [' '.join(rng.choice(words) for _ in range(rng.randint(3, 12))) + "." for _ in range(4000)]
+
+    table = Table("Processes", "Time", "Sentences per second", "Speedup", title=f"Translating {len(texts)} sentences in a translation pool", box=box.ROUNDED)
+    baseline = None
+    processes = 1
+    while True:
+        translater.analysis_cache.clear() # so every run has to do the same amount of work
+
+        start = perf_counter()
+        translater.translate_many(texts, "gorgus", processes=processes)
+        elapsed = perf_counter() - start
+
+        baseline = baseline or elapsed
+        table.add_row(str(processes), f"{elapsed:.2f}s", f"{len(texts) / elapsed:.0f}", f"{baseline / elapsed:.2f}x")
+
+        if processes >= (os.cpu_count() or 1):
+            break
+        processes = min(processes * 2, os.cpu_count())
+
+    console.print(table)
+    if not translater.can_fork():
+        console.print("[yellow]This platform can't fork, so every run used one process.[/yellow]")
+#endregion
+
+
+#region Output assembly
+def bench_assembly():
+    import translater
+
+    translater.translator.warm_up()
+
+    # lots of future tense verbs (which remove the "will" before them) and modifiers (which remove themselves), all in one long text
+    sentences = ["I will eat the food.", "They will run very fast.", "The cats will really sleep.", "We will go home now, they ate pizza!"]
+
+    table = Table("Input size", "Time", "Time per KB", "vs 1 KB", title="to_gorgus on one long text", box=box.ROUNDED)
+    first_per_kb = None
+    for size, label in [(1_000, "1 KB"), (100_000, "100 KB"), (10_000_000, "10 MB")]:
+        rng = random.Random(0)
+        parts = []
+        length = 0
+        while length < size:
+            parts.append(rng.choice(sentences))
+            length += len(parts[-1]) + 1
+        text = ' '.join(parts).lower()
+
+        translater.to_gorgus(text[:1000]) # so the analysis cache is warm for every size
+        start = perf_counter()
+        translater.to_gorgus(text)
+        elapsed = perf_counter() - start
+
+        per_kb = elapsed / (len(text) / 1000)
+        first_per_kb = first_per_kb or per_kb
+        table.add_row(label, f"{elapsed * 1e3:.1f}ms", f"{per_kb * 1e6:.0f}µs", f"{per_kb / first_per_kb:.2f}x")
+
+    console.print(table)
+    console.print("[dim]If assembling the output is linear, the time per KB stays about the same.[/dim]")
+#endregion
+
+
+#region Suite
+SUITE_VERSION = 1 # bump this if the corpora change, results from different versions can't be compared
+
+# fixed corpora, so results can be compared between runs (and between versions of the translator)
+ENGLISH_SENTENCES = SENTENCES + [
+    "Do you like to eat?",
+    "Why is the sky blue?",
+    "He slept.",
+    "The teacher will eat the cats.",
+    "I am going to run to the big house.",
+    "The workers were eating slowly and the dogs barked.",
+    "Thank you very much, how old are you?",
+    "We will go home now, they ate pizza!",
+]
+
+GORGUS_SENTENCES = [
+    "Dink, dup pritterok lunk",
+    "Henġer agger ikfren!",
+    "Glonk chonġle̱ok migtir omnom!",
+    "Googrung kiff!",
+    "Minġer goob'rung ji dagsâ dublub. :)",
+    "Jid shrerack, henġer huffer clor'ge dagsa.",
+    "Ikshmack horge kithrark̂.",
+    "Toopyat!",
+    "Nåck eepra.",
+    "Ikshmackak chonġlera.",
+    "Dagunġa̐ gorse̱ latwa̐.",
+]
+
+def make_corpus(sentences, sentences_per_text, text_count, seed):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(sentences) for _ in range(sentences_per_text)) for _ in range(text_count)]
+
+CORPUS_SIZES = {
+    # size: (sentences per text, number of texts)
+    "sentence": (1, 40),
+    "paragraph": (6, 15),
+    "document": (60, 3),
+}
+
+CORPORA = {
+    language: {size: make_corpus(sentences, per_text, count, seed=i) for i, (size, (per_text, count)) in enumerate(CORPUS_SIZES.items())}
+    for language, sentences in [("english", ENGLISH_SENTENCES), ("gorgus", GORGUS_SENTENCES)]
+}
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+def clear_caches():
+    """Forget everything the translator has cached, so the next call is as slow as the first one ever would be."""
+    import translater
+    from ipa import get_ipa_word
+    from affixes import analyze_gorgus_word
+
+    translater.analysis_cache.clear()
+    translater.unigram_tagger.lookup.cache_clear()
+    get_ipa_word.cache_clear()
+    analyze_gorgus_word.cache_clear()
+
+def measure(function, inputs, warmup, repeats, cold):
+    """Call `function` on every input `repeats` times (after `warmup` untimed rounds), returns every call's latency."""
+    for _ in range(warmup):
+        for item in inputs:
+            function(item)
+
+    latencies = []
+    for _ in range(repeats):
+        for item in inputs:
+            if cold:
+                clear_caches()
+            start = perf_counter()
+            function(item)
+            latencies.append(perf_counter() - start)
+
+    return latencies
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "mean": sum(latencies) / len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / sum(latencies) if sum(latencies) else 0.0 # calls per second
+    }
+
+def get_suite_cases():
+    """Every `(name, function, inputs)` the suite measures."""
+    import translater
+    from ipa import get_ipa_pronounciation
+
+    quiet_console = translater.Console(file=io.StringIO())
+
+    def inspect(sentence):
+        # cli_inspect prints everything, which we don't want to measure (or see)
+        console, translater.console = translater.console, quiet_console
+        try:
+            translater.cli_inspect(Namespace(sentence=sentence, json=False, verbose=True, morph=False, translate=False, notes=False, phonetics=False, output=None, profile=False))
+        finally:
+            translater.console = console
+            quiet_console.file.seek(0)
+            quiet_console.file.truncate()
+
+    cases = []
+    for size in CORPUS_SIZES:
+        english = [text.lower() for text in CORPORA["english"][size]]
+        gorgus = [text.lower() for text in CORPORA["gorgus"][size]]
+
+        cases.append((f"to_gorgus/{size}", translater.to_gorgus, english))
+        cases.append((f"from_gorgus/{size}", translater.from_gorgus, gorgus))
+        cases.append((f"get_ipa_pronounciation/{size}", get_ipa_pronounciation, CORPORA["gorgus"][size]))
+        cases.append((f"cli_inspect/{size}", inspect, gorgus))
+
+    return cases
+
+def compare_to_baseline(results, baseline, threshold):
+    """Returns `(name, baseline p50, p50)` for every case whose median latency got more than `threshold` (0.2 = 20%) slower."""
+    regressions = []
+    for name, result in results["results"].items():
+        old = baseline["results"].get(name)
+        if old and result["p50"] > old["p50"] * (1 + threshold):
+            regressions.append((name, old["p50"], result["p50"]))
+    return regressions
+
+def run_suite(warmup = 2, repeats = 5, cold = False, only = None, output = "benchmark_results.json", baseline = "benchmark_baseline.json", save_baseline = False, threshold = 0.2):
+    """Run the benchmark suite, save the results and compare them to the baseline. Returns `False` if something regressed."""
+    import translater
+
+    console.print("[bold bright_green]INFO[/bold bright_green] Warming up the translator..")
+    translater.translator.warm_up()
+
+    results = {
+        "version": SUITE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cold": cold,
+        "warmup": warmup,
+        "repeats": repeats,
+        "results": {}
+    }
+
+    cases = [case for case in get_suite_cases() if not only or case[0].split("/")[0] in only]
+    for name, function, inputs in cases:
+        console.print(f"[dim]Running {name}...[/dim]", highlight=False)
+        results["results"][name] = summarize(measure(function, inputs, warmup, repeats, cold))
+
+    baseline_results = None
+    if baseline and not save_baseline:
+        try:
+            with open(baseline, "r", encoding="utf-8") as f:
+                baseline_results = json.load(f)
+        except OSError:
+            console.print(f"[dim]No baseline found at {baseline}, run with --save-baseline to make one.[/dim]", highlight=False)
+        else:
+            if (baseline_results.get("version"), baseline_results.get("cold")) != (SUITE_VERSION, cold):
+                console.print("[bold orange1]Warning![/bold orange1] The baseline was made with different corpora or cache settings, ignoring it.")
+                baseline_results = None
+
+    table = Table(Column("Benchmark", no_wrap=True), "Calls", "p50", "p95", "p99", "Throughput", "vs baseline", title=f"Benchmark suite ({'cold' if cold else 'warm'} caches)", box=box.ROUNDED)
+    for name, result in results["results"].items():
+        comparison = ""
+        if baseline_results and baseline_results["results"].get(name, {}).get("p50"):
+            change = result["p50"] / baseline_results["results"][name]["p50"] - 1
+            colour = "red" if change > threshold else "green" if change < -threshold else "dim"
+            comparison = f"[{colour}]{change * 100:+.1f}%[/{colour}]"
+
+        table.add_row(
+            name,
+            str(result["calls"]),
+            f"{result['p50'] * 1e3:.2f}ms",
+            f"{result['p95'] * 1e3:.2f}ms",
+            f"{result['p99'] * 1e3:.2f}ms",
+            f"{result['throughput']:.1f}/s",
+            comparison
+        )
+    console.print(table)
+
+    for path in [output] + ([baseline] if save_baseline else []):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=4)
+            console.print(f"[dim]Saved results to {path}[/dim]", highlight=False)
+
+    regressions = compare_to_baseline(results, baseline_results, threshold) if baseline_results else []
+    for name, old, new in regressions:
+        console.print(f"[bold red]Regression![/bold red] {name} went from {old * 1e3:.3f}ms to {new * 1e3:.3f}ms (p50)", highlight=False)
+
+    return not regressions
+#endregion
+
+
+BENCHMARKS = {
+    "phrases": bench_phrases,
+    "gorgus_phrases": bench_gorgus_phrases,
+    "ipa": bench_ipa,
+    "batch": bench_batch,
+    "scaling": bench_scaling,
+    "assembly": bench_assembly,
+    "suite": run_suite,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            console.print(f"[red]Unknown benchmark \"{name}\"![/red] Options are: {', '.join(BENCHMARKS)}")
+            exit(1)
+        BENCHMARKS[name]()
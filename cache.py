@@ -0,0 +1,207 @@
+#
+#  cache.py
+#
+import json
+import sqlite3
+from time import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """A dictionary that only remembers the `max_size` most recently used items.
+
+    It also keeps track of how many hits, misses and evictions it has had, so we can
+    tell if it's actually helping. Setting `max_size` to `0` turns the cache off.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = Lock() # the app translates from worker threads
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if self.max_size <= 0:
+                return
+
+            self.items[key] = value
+            self.items.move_to_end(key)
+            self._evict()
+
+    def resize(self, max_size):
+        with self.lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        """Forget everything, including the stats."""
+        with self.lock:
+            self.items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _evict(self):
+        while len(self.items) > max(self.max_size, 0):
+            self.items.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class PersistentCache:
+    """Like `LRUCache`, but saved to an SQLite database so it survives restarts and can be shared between processes.
+
+    Keys can be anything JSON can store, values have to be strings. Every entry belongs to a `namespace`, opening
+    the cache with a different namespace throws away everything from the old one. When there are more than `max_size`
+    entries, the least recently used ones get evicted. Once it's closed, every `get` is a miss and `put` does nothing,
+    so a thread that's still holding on to it doesn't crash.
+    """
+
+    def __init__(self, path, namespace="", max_size=100_000):
+        self.path = path
+        self.namespace = namespace
+        self.max_size = max_size
+        self.lock = Lock()
+        self.closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL") # other processes can keep reading while we write
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (namespace, key))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS cache_last_used ON cache (last_used)")
+            self.connection.execute("DELETE FROM cache WHERE namespace != ?", (namespace,))
+
+        self.size = self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key, default=None):
+        key = json.dumps(key, ensure_ascii=False)
+        with self.lock:
+            if self.closed:
+                self.misses += 1
+                return default
+
+            with self.connection:
+                row = self.connection.execute("SELECT value FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return default
+
+                self.connection.execute("UPDATE cache SET last_used = ? WHERE namespace = ? AND key = ?", (time(), self.namespace, key))
+                self.hits += 1
+                return row[0]
+
+    def put(self, key, value):
+        key = json.dumps(key, ensure_ascii=False)
+        with self.lock:
+            if self.max_size <= 0 or self.closed:
+                return
+
+            with self.connection:
+                self.connection.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (self.namespace, key, value, time()))
+                self.size += 1
+
+                if self.size > self.max_size:
+                    # another process might have added (or evicted) entries too, so actually count them.
+                    # we evict a bit more than we need to, so we don't have to do this again on the very next put
+                    self.size = self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                    if self.size > self.max_size:
+                        self._evict(int(self.max_size * 0.9))
+
+    def resize(self, max_size):
+        with self.lock:
+            self.max_size = max_size
+            if self.closed:
+                return
+
+            with self.connection:
+                self.size = self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                self._evict()
+
+    def clear(self):
+        """Forget everything, including the stats."""
+        with self.lock:
+            if not self.closed:
+                with self.connection:
+                    self.connection.execute("DELETE FROM cache")
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def close(self):
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.connection.close()
+
+    def _evict(self, target_size=None):
+        if target_size is None:
+            target_size = self.max_size
+
+        excess = self.size - max(target_size, 0)
+        if excess > 0:
+            self.connection.execute("DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY last_used LIMIT ?)", (excess,))
+            self.size -= excess
+            self.evictions += excess
+
+    def __len__(self):
+        with self.lock:
+            if self.closed:
+                return 0
+            return self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __contains__(self, key):
+        key = json.dumps(key, ensure_ascii=False)
+        with self.lock:
+            if self.closed:
+                return False
+            return self.connection.execute("SELECT 1 FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)).fetchone() is not None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -9,7 +9,7 @@ from pyfiglet import print_figlet
 from client_server.packet import Packet, PacketType
 
 from translations import translation_dictionary
-from translater import remove_all_except
+from util import remove_all_except
 from random import choice
 
 from argparse import ArgumentParser
@@ -0,0 +1,141 @@
+#
+#  compact_tagger.py
+#
+import os
+import mmap
+import struct
+from functools import lru_cache
+
+# File layout (all numbers are little endian, like every platform we run on, so the arrays can be read in place):
+#   header:  magic, version, word count, tag count
+#   tags:    every tag name, each one prefixed by its length (u8)
+#   offsets: word count + 1 u32s, where each word starts in the string table
+#   tag ids: word count u16s, the tag of each word
+#   strings: every word encoded as utf-8, sorted by their bytes so we can binary search them
+MAGIC = b"GTAG"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+
+
+class CompactTagger:
+    """A unigram tagger that looks words up straight from a memory-mapped file.
+
+    Nothing gets unpickled and no dictionary gets built when it loads, so loading it is
+    pretty much instant and it only uses memory for the parts of the file that are actually read.
+    It tags tokens exactly like the NLTK `UnigramTagger` it was made from (`None` for unknown words).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError, AttributeError): # no mmap (like in the WASM version of CPython) or an empty file
+                self.data = f.read()
+
+        try:
+            position = self._read_header(path)
+        except ValueError:
+            if isinstance(self.data, mmap.mmap):
+                self.data.close() # so the broken file can be deleted, even on windows
+            raise
+
+        view = memoryview(self.data)
+        self.offsets = view[position:position + (self.word_count + 1) * 4].cast("I")
+        position += (self.word_count + 1) * 4
+        self.tag_ids = view[position:position + self.word_count * 2].cast("H")
+        position += self.word_count * 2
+        self.strings_start = position
+
+        # most text uses the same words over and over again
+        self.lookup = lru_cache(maxsize=8192)(self._lookup)
+
+    def _read_header(self, path):
+        """Read the header and the tag names, and make sure the whole file is there. Returns where the offsets start."""
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a compact tagger file!")
+
+        magic, version, self.word_count, tag_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compact tagger file!")
+        if version != VERSION:
+            raise ValueError(f"{path} is version {version} of the compact tagger format, but only version {VERSION} is supported.")
+
+        position = HEADER.size
+        self.tags = []
+        for _ in range(tag_count):
+            if position >= len(self.data):
+                raise ValueError(f"{path} is truncated!")
+            length = self.data[position]
+            self.tags.append(self.data[position + 1:position + 1 + length].decode("utf-8")) # a cut off tag raises a UnicodeDecodeError, which is a ValueError
+            position += 1 + length
+
+        # a file that didn't get written all the way would have us reading past the end
+        strings_start = position + (self.word_count + 1) * 4 + self.word_count * 2
+        if len(self.data) < strings_start:
+            raise ValueError(f"{path} is truncated!")
+        strings_length = struct.unpack_from("<I", self.data, position + self.word_count * 4)[0] # the last offset
+        if len(self.data) < strings_start + strings_length:
+            raise ValueError(f"{path} is truncated!")
+
+        return position
+
+    def __len__(self):
+        return self.word_count
+
+    def _word_at(self, index):
+        return self.data[self.strings_start + self.offsets[index]:self.strings_start + self.offsets[index + 1]]
+
+    def _lookup(self, word):
+        """Returns the tag of `word`, or `None` if the tagger doesn't know it."""
+        key = word.encode("utf-8")
+
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.word_count and self._word_at(low) == key:
+            return self.tags[self.tag_ids[low]]
+        return None
+
+    def items(self):
+        """Every `(word, tag)` in the tagger, like `_context_to_tag.items()` on an NLTK `UnigramTagger`."""
+        for index in range(self.word_count):
+            yield self._word_at(index).decode("utf-8"), self.tags[self.tag_ids[index]]
+
+    def tag(self, tokens):
+        """Same as NLTK's `UnigramTagger.tag`, returns a list of `(token, tag)` tuples."""
+        return [(token, self.lookup(token)) for token in tokens]
+
+
+def save_compact_tagger(word_to_tag, path, vocabulary=None):
+    """Save a `word -> tag` dictionary (like a `UnigramTagger`'s `_context_to_tag`) in the compact tagger format.
+
+    If `vocabulary` is given, only words in it are saved. That makes the file a lot smaller, but any other word will be unknown.
+    """
+    if vocabulary is not None:
+        word_to_tag = {word: tag for word, tag in word_to_tag.items() if word in vocabulary}
+
+    entries = sorted((word.encode("utf-8"), tag) for word, tag in word_to_tag.items() if tag is not None)
+    tags = sorted({tag for _, tag in entries})
+    tag_ids = {tag: i for i, tag in enumerate(tags)}
+
+    offsets = [0]
+    for word, _ in entries:
+        offsets.append(offsets[-1] + len(word))
+
+    # write to a temporary file first, so a half written file never gets loaded
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries), len(tags)))
+        for tag in tags:
+            encoded = tag.encode("utf-8")
+            f.write(struct.pack("<B", len(encoded)) + encoded)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(entries)}H", *(tag_ids[tag] for _, tag in entries)))
+        for word, _ in entries:
+            f.write(word)
+    os.replace(temporary_path, path)
@@ -0,0 +1,95 @@
+#
+#  dictionary_search.py
+#
+from collections import namedtuple, defaultdict
+from threading import Lock
+
+# everything the dictionary tab shows about a gorgus word. `english` is the list of english words it translates to
+DictionaryEntry = namedtuple("DictionaryEntry", ["gorgus", "english", "informal", "extra_info"])
+
+# the longest n-grams that get indexed, longer queries are narrowed down with every n-gram in them
+NGRAM_SIZE = 3
+
+
+def get_ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def get_all_ngrams(text):
+    """Every substring of `text` that's between 1 and `NGRAM_SIZE` characters long."""
+    ngrams = set()
+    for n in range(1, NGRAM_SIZE + 1):
+        ngrams.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return ngrams
+
+
+class DictionarySearch:
+    """Finds every dictionary entry where the gorgus word or one of its english words contains a search query.
+
+    Every 1, 2 and 3 character substring of every entry is indexed once, so a search only has to look at
+    the entries that have the query's rarest trigram in them, instead of the whole dictionary. When a query
+    contains the previous query (like when someone types one more letter), only the previous results get checked.
+    The index gets built the first time something is searched for (or when `build_index` is called), which
+    can take a few seconds for a really big dictionary.
+    """
+
+    def __init__(self, translation_dictionary, dictionary_information):
+        informal_words = set(dictionary_information.get("informal_words", []))
+        extra_info = dictionary_information.get("extra_info", {})
+
+        self.entries = []
+        for gorgus, english in translation_dictionary.items():
+            if gorgus.startswith("<") and gorgus.endswith(">"): # ensure we don't include internal words
+                continue
+
+            english = [english] if isinstance(english, str) else list(english)
+            self.entries.append(DictionaryEntry(gorgus, english, gorgus in informal_words, extra_info.get(gorgus)))
+
+        self.everything = list(range(len(self.entries)))
+        self.last_search = ("", self.everything)
+
+        self.index = None
+        self.index_lock = Lock()
+
+    def build_index(self):
+        """Build the n-gram index, if it hasn't been built yet."""
+        with self.index_lock:
+            if self.index is not None:
+                return
+
+            # n-gram -> ids of every entry that has it, in dictionary order
+            index = defaultdict(list)
+            for entry_id, entry in enumerate(self.entries):
+                ngrams = set()
+                for text in [entry.gorgus] + entry.english:
+                    ngrams.update(get_all_ngrams(text))
+                for ngram in ngrams:
+                    index[ngram].append(entry_id)
+
+            self.index = dict(index)
+
+    def matches(self, entry_id, query):
+        entry = self.entries[entry_id]
+        return query in entry.gorgus or any(query in english for english in entry.english)
+
+    def search(self, query):
+        """Get the ids of every entry that matches `query`, in dictionary order."""
+        if query == "":
+            return self.everything
+
+        self.build_index()
+
+        if len(query) <= NGRAM_SIZE:
+            # the index already knows exactly which entries have this in them
+            results = self.index.get(query, [])
+        else:
+            last_query, last_results = self.last_search # read once, another thread might be searching too
+            if last_query and last_query in query:
+                # anything that matches this query matched the last one too
+                candidates = last_results
+            else:
+                candidates = min((self.index.get(ngram, []) for ngram in get_ngrams(query, NGRAM_SIZE)), key=len)
+
+            results = [entry_id for entry_id in candidates if self.matches(entry_id, query)]
+
+        self.last_search = (query, results)
+        return results
@@ -6,7 +6,8 @@ from textual import on
 from textual.validation import Validator
 
 from translations import translation_dictionary
-from translater import translate, remove_all_except
+from translater import translate
+from util import remove_all_except
 from random import choice
 
 
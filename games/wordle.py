@@ -9,9 +9,9 @@ import datetime
 import random
 
 from translations import translation_dictionary
-from translater import remove_all_except, translate
+from translater import translate
 
-from util import get_settings, modify_json
+from util import get_settings, modify_json, remove_all_except
 
 
 class WordleGame(ModalScreen):
@@ -0,0 +1,99 @@
+#
+#  ipa.py
+#
+from functools import lru_cache
+
+from translations import translation_dictionary
+
+# romanization -> IPA, if more than one romanization makes the same sound they go in a list
+IPA_CONSONANTS = {
+    "lʊː": ["lu"],
+    "ʃ": ["sh", "ćh"],
+    "O": ["oe", "ó"],
+    "l": ["l", "ll"],
+    "iː": ["ee", "é", "ea"],
+    "h": ["h"],
+    "ɜː": ["er", "ur"],
+    "ɔɹ": ["or"],
+    "tʃ": ["ch"],
+    "ʌ": ["u"],
+    "ʊː": ["oo", "ú"],
+    "ɔ": ["o"],
+    "iːkO": ["eeko"],
+    "ʤ": ["j"],
+    "ɔɹʤ": ["orge"],
+    "ɹ": ["r"],
+    "f": ["f", "ff"],
+    "kw": ["q", "qu"],
+    "ɔɹs": ["ors", "orse"],
+    "ŋg": ["nġ"],
+    "iŋg": ["ing"],
+    "ŋ": ["ng"],
+    "oŋk": ["onk"],
+    "t": ["t", "tt"],
+    "ɑːɹ": ["ar", "å"],
+    "k": ["k", "c", "ck"],
+    "g": ["g", "gg"],
+    "ɛ": ["è"],
+    "R": ["ŕ̈"], # r trill
+    "e͡ɪ": ["ae", "ä", "â", "ai", "ay"],
+    "ɪ": ["i"],
+    "ɪŋk": ["ink"],
+    "eŋk": ["enk"],
+    "θ": ["th"],
+    "e͡ɪv": ["ave"],
+    "j": ["y"],
+    "ks": ["x"],
+    "lʌ̌ŋk": ["lunk"], # questions have a rising tone
+    "iːnO": ["ino"],
+    "vɪŋ": ["ving"],
+    "Oʊʤ": ["oge"],
+    "ɹs": ["rse"],
+    "aɪk": ["ike"],
+    "aɪd": ["ide", "ied"],
+    "kχ": ["ç"],
+    "m": ["m", "mm", "mmm"],
+    "ː": [translation_dictionary["<EXAGGERATED_VERB>"]], # exaggerated vowel
+    "\u0324˨˩": [translation_dictionary["<GENTLE_VERB>"]], # gentle
+    "": ['a̱', 'ḇ', 'c̱', 'ḏ', 'e̱', 'f̱', 'g̱', 'ẖ', 'i̱', 'j̱', 'ḵ', 'ḻ', 'm̱', 'ṉ', 'o̱', 'p̱', 'q̱', 'ṟ', 's̱', 'ṯ', 'u̱', 'v̱', 'w̱', 'x̱', 'y̱', 'ẕ'] # silent letters
+}
+
+def create_ipa_dict(consonants):
+    ipa_dict = {}
+    for ipa, romanizations in consonants.items():
+        for roman in romanizations:
+            ipa_dict[roman] = ipa
+    return ipa_dict
+
+def compile_ipa_rules(consonants):
+    """Turn the consonants table into the list of `(romanization, ipa)` rules that gets applied to every word.
+
+    Longer romanizations go first. The rules get applied one after another, so a later rule
+    can change what an earlier rule wrote (e.g. "ee" -> "iː" -> "ɪː"). Some words in the
+    dictionary rely on this, which is why this isn't a single longest-match pass.
+    """
+    return sorted(create_ipa_dict(consonants).items(), key=lambda x: -len(x[0])) # Sort by length (longest first)
+
+# only do this once, instead of every time we want a pronounciation
+IPA_RULES = compile_ipa_rules(IPA_CONSONANTS)
+IPA_PUNCTUATION_TABLE = str.maketrans('', '', "?!\":()=/\\$[]")
+
+@lru_cache(maxsize=8192)
+def get_ipa_word(word: str):
+    """Get the IPA for a single (lowercase, punctuation free) word. Results are cached, so common words are basically free."""
+    ipa_word = word
+
+    for roman, ipa in IPA_RULES:
+        if roman in ipa_word:
+            ipa_word = ipa_word.replace(roman, ipa)
+
+    return ipa_word.replace("R", "r").replace("O", "o")
+
+def get_ipa_pronounciation(gorgus: str):
+    gorgus = gorgus.replace(",", " |").replace(".", " ‖").replace("!", " ‖")
+    gorgus = gorgus.translate(IPA_PUNCTUATION_TABLE)
+    gorgus = gorgus.lower().replace("-", "").replace("'", ".")
+
+    words = gorgus.split()  # Split into words
+
+    return "/" + ' '.join(get_ipa_word(word) for word in words) + "/"
@@ -12,7 +12,20 @@ import subprocess
 # hopefully fix some issues
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
+# `python main.py --profile-startup` shows how long every part of starting up took (until the app is on the screen, then it quits),
+# `--startup-report PATH` saves it to PATH as JSON too
+from profiling import startup_profiler
+
+STARTUP_REPORT_PATH = None
+if "--startup-report" in sys.argv and sys.argv.index("--startup-report") + 1 < len(sys.argv):
+    STARTUP_REPORT_PATH = sys.argv[sys.argv.index("--startup-report") + 1]
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv or STARTUP_REPORT_PATH is not None
+if PROFILE_STARTUP:
+    startup_profiler.enable()
+
 print("Checking for dependencies...")
+startup_profiler.mark("import git")
 GIT_AVAILABLE = True
 try:
     import git
@@ -42,10 +55,12 @@ def install_module(module_name):
         pass
         #print(f"{module_name} is already installed.")
 
+startup_profiler.mark("requirements check")
 with open("requirements.txt", "r") as f:
     for line in f.readlines():
         install_module(line.strip("\n"))
 
+startup_profiler.mark("import rich")
 from rich import print as rich_print
 
 rich_print("\n[bold]=== Gorgus Translator ===[/bold]")
@@ -57,33 +72,66 @@ else:
     rich_print("[bold bright_green]INFO[/bold bright_green] [bold]gitpython[/bold] found! :)")
 
 rich_print("[bold bright_green]INFO[/bold bright_green] Loading [bold]textual[/bold]..")
+startup_profiler.mark("import textual")
 
 from textual.app import App, ComposeResult, SystemCommand
-from textual.widgets import TextArea, Header, Footer, TabbedContent, TabPane, Select, Label, MarkdownViewer, DataTable, Input, Rule, Checkbox, Button, Markdown
+from textual.widgets import TextArea, Header, Footer, TabbedContent, TabPane, Select, Label, MarkdownViewer, Input, Rule, Checkbox, Button, Markdown
 from textual.containers import Horizontal, Vertical, VerticalScroll, ItemGrid, Center
 from textual import on, work, log, events
 from textual.css.query import NoMatches
-from textual.worker import WorkerState
+from textual.worker import WorkerState, get_current_worker
+from rich.text import Text
 from pyperclip import copy
-from time import sleep
+from time import sleep, perf_counter
+from functools import lru_cache
+from threading import Lock
 
 rich_print("[bold bright_green]INFO[/bold bright_green] Loading [bold]utility[/bold] functions..")
-from util import get_settings, modify_json
+startup_profiler.mark("import util")
+from util import get_settings, modify_json, reset_settings
 
 rich_print("[bold bright_green]INFO[/bold bright_green] Loading [bold]games[/bold]..")
+startup_profiler.mark("import games")
 from widgets.game import Game, GameInfo
 from games.wordle import WordleGame
 from games.hangman import Hangman
 from games.typing_game import TypingGame
 from widgets.message_box import MessageBox
+from widgets.virtual_table import VirtualTable
 
 rich_print("[bold bright_green]INFO[/bold bright_green] Loading translation dictionary..")
+startup_profiler.mark("import translations")
 
 from translations import translation_dictionary, phrase_translations, dictionary_information
+from dictionary_search import DictionarySearch
+
+dictionary_search = DictionarySearch(translation_dictionary, dictionary_information)
+
+NO_DICTIONARY_RESULTS_ROW = ("[blue]Hmm..[/blue]", "[green]No search results found, sorry.[/green]", "[red]:([/red]")
+
+@lru_cache(maxsize=4096)
+def get_dictionary_row(entry_id):
+    """The row of a word in the dictionary tab, the rows of the words that were shown recently are kept around."""
+    entry = dictionary_search.entries[entry_id]
+
+    info = []
+    if entry.informal:
+        info.append("[red]informal[/red]")
+    if entry.extra_info:
+        info.append(entry.extra_info)
+
+    return (
+        Text.from_markup(f"[blue]{entry.gorgus}[/blue]"),
+        Text.from_markup(f"[green]{', '.join(entry.english)}[/green]"),
+        Text.from_markup(', '.join(info))
+    )
 
 rich_print("[bold bright_green]INFO[/bold bright_green] Starting translater..")
+startup_profiler.mark("import translater")
 
-from translater import translate, get_ipa_pronounciation
+from translater import translator, translate_many, split_sentences, join_sentences, get_ipa_pronounciation, enable_translation_cache, disable_translation_cache
+from cache import LRUCache
+translator.warm_up(verbose=True)
 
 rich_print("\n[bold bright_green]Done![/bold bright_green] Loading complete!")
 
@@ -145,6 +193,21 @@ class GorgusTranslator(App):
     translation = ""
     translation_input = "Hey! How are you?"
 
+    # how long to wait for the user to stop typing before translating (in seconds)
+    TRANSLATION_DEBOUNCE = 0.15
+
+    # goes up every time the translation needs updating, so a worker can tell if its translation is already out of date
+    translation_request = 0
+
+    # (sentence, language, formal, accents) -> (translation, ipa), so editing a long text only retranslates the sentences that changed
+    sentence_cache = LRUCache(4096)
+
+    # how many sentences get translated at once, a worker that's out of date stops after the batch it's working on
+    TRANSLATION_BATCH_SIZE = 16
+
+    # only one worker translates at a time, the others wait for it to finish (or notice it's out of date and stop)
+    translating = Lock()
+
     def get_system_commands(self, screen):
         yield SystemCommand(
             "Quit the application",
@@ -290,45 +353,21 @@ class GorgusTranslator(App):
     @work(thread=True, group="dictionary", exclusive=True)
     def update_dictionary_table(self, table, search, include_informal_words: bool = True):
         search = search.strip().lower()
-        
-        num_words = 0
-        for gorgus, english in translation_dictionary.items():
-            if gorgus.startswith("<") and gorgus.endswith(">"): # ensure we don't include internal words
-                continue
-            
-            def search_in_string_or_list(search_query, data):
-                if isinstance(data, list):
-                    for string in data:
-                        if search_query in string:
-                            return True
-                    return False
-                elif isinstance(data, str):
-                    return search_query in data
-                else:
-                    raise TypeError("Data must be a string or a list of strings")
-                
-            if not search_in_string_or_list(search, gorgus) and not search_in_string_or_list(search, english):
-                continue
 
-            info = []
-            if gorgus in dictionary_information.get("informal_words"):
-                if not include_informal_words:
-                    continue
+        entry_ids = dictionary_search.search(search)
+        if not include_informal_words:
+            entry_ids = [entry_id for entry_id in entry_ids if not dictionary_search.entries[entry_id].informal]
 
-                info.append("[red]informal[/red]")
-            extra_info = dictionary_information.get("extra_info").get(gorgus)
-            if extra_info:
-                info.append(extra_info)
-            info = ', '.join(info)
+        if get_current_worker().is_cancelled: # someone typed something else already
+            return
 
-            if type(english) == str:
-                table.add_row(f"[blue]{gorgus}[/blue]", f"[green]{english}[/green]", info)
-            elif type(english) == list:
-                table.add_row(f"[blue]{gorgus}[/blue]", f"[green]{', '.join(english)}[/green]", info)
-            num_words += 1
+        if entry_ids:
+            self.call_from_thread(table.set_rows, entry_ids, get_dictionary_row)
+        else:
+            self.call_from_thread(table.set_rows, [None], lambda _: NO_DICTIONARY_RESULTS_ROW)
 
-        if num_words == 0:
-            table.add_row("[blue]Hmm..[/blue]", "[green]No search results found, sorry.[/green]", "[red]:([/red]")
+        # get the search index ready while nobody's searching yet, so the first search doesn't have to wait for it
+        dictionary_search.build_index()
 
     @work(thread=True, group="delete-settings", exclusive=True)
     def delete_settings(self):
@@ -351,8 +390,7 @@ class GorgusTranslator(App):
         else:
             self.deleting_settings = False
 
-            if os.path.isfile("settings.json"):
-                os.remove("settings.json")
+            reset_settings()
 
             settings = get_settings()
             for widget in self.query(".setting"):
@@ -368,16 +406,21 @@ class GorgusTranslator(App):
     @on(Checkbox.Changed)
     def checkbox_changed(self, event):
         if "setting" in event.checkbox.classes:
+            modify_json("settings.json", event.checkbox.id, event.checkbox.value) # before retranslating, which reads the settings
+
             if event.checkbox.id in ["clock_enabled", "show_ipa"]: # certain settings require a restart to take effect
                 self.notify("You need to restart for this change to take effect.", title="Setting Changed")
 
             if event.checkbox.id in ["add_pronounciation_accents", "formal_gorgus"]:
                 self.update_translation()
 
-            modify_json("settings.json", event.checkbox.id, event.checkbox.value)
+            if event.checkbox.id == "persistent_translation_cache":
+                if event.checkbox.value:
+                    enable_translation_cache()
+                else:
+                    disable_translation_cache()
         elif event.checkbox.id == "informal_words_checkbox":
             table = self.query_one("#dict-table")
-            table.clear()
             self.update_dictionary_table(table, self.query_one("#search-input").value, event.checkbox.value) # update dictionary if the user disables informal words
 
     @on(Button.Pressed)
@@ -394,19 +437,18 @@ class GorgusTranslator(App):
         if event.text_area.id != "translate-input": return
 
         self.translation_input = event.text_area.text
-        self.update_translation()
+        self.update_translation(debounce=self.TRANSLATION_DEBOUNCE)
     
     @on(Input.Changed)
     def search_dictionary(self, event):
         if event.input.id == "search-input":
             try:
-                table: DataTable = self.query_one("#dict-table")
+                table: VirtualTable = self.query_one("#dict-table")
             except NoMatches:
                 return
             
             informal_checkbox = self.query_one("#informal_words_checkbox")
 
-            table.clear()
             self.update_dictionary_table(table, event.input.value, informal_checkbox.value)
 
     @on(Select.Changed)
@@ -430,41 +472,98 @@ class GorgusTranslator(App):
             self.theme = chosen_theme
             
 
-    @work(group="translate")
-    async def update_translation(self):
-        output_text_area = self.app.query_one("#output")
+    def update_translation(self, debounce = 0):
+        """Translate the input again, in the background. Only the newest input ever gets shown.
+
+        With `debounce`, it waits that many seconds first, so typing quickly doesn't translate every keystroke.
+        """
+        self.translation_request += 1
 
         settings = get_settings()
-        show_ipa = settings["show_ipa"]
+        selection = self.query_one("#to-select").value
 
-        if show_ipa:
-            pronounciation = self.app.query_one("#pronounciation")
-        translate_to_selection = self.query_one("#to-select")
+        self.translate_in_background(self.translation_input, selection, settings, self.translation_request, debounce, perf_counter())
+
+    # exclusive, so starting a new translation cancels the old one (it still has to finish the batch of sentences
+    # it's in the middle of, because threads can't be interrupted, but it won't translate any more or show anything)
+    @work(thread=True, group="translate", exclusive=True)
+    def translate_in_background(self, text, selection, settings, request, debounce, requested_at):
+        worker = get_current_worker()
 
-        selection = translate_to_selection.value
-        #self.app.notify(selection)
+        if debounce:
+            sleep(debounce)
+            if worker.is_cancelled:
+                return
+
+        with self.translating:
+            if not worker.is_cancelled: # a newer translation came in while we were waiting
+                self.translate_and_show(worker, text, selection, settings, request, requested_at)
 
+    def translate_and_show(self, worker, text, selection, settings, request, requested_at):
+        show_ipa = settings["show_ipa"]
         should_add_accents = settings["add_pronounciation_accents"]
         pronounciation_text = ""
 
+        start = perf_counter()
         if selection == 1:
-            self.translation = translate(self.translation_input, "gorgus", formal=settings["formal_gorgus"], should_add_accents=should_add_accents)
+            translation, ipa, translated_count, sentence_count = self.translate_sentences(worker, text, "gorgus", settings["formal_gorgus"], should_add_accents)
 
             if show_ipa:
-                pronounciation_text = "[dim]" + get_ipa_pronounciation(self.translation) + "[/dim]"
-
-            #output_text_area.text = translate(text, "gorgus", should_add_accents=should_add_accents)
+                pronounciation_text = "[dim]" + ipa + "[/dim]"
         elif selection == 2:
-            self.translation = translate(self.translation_input, "english", should_add_accents=should_add_accents)
+            translation, _, translated_count, sentence_count = self.translate_sentences(worker, text, "english", True, should_add_accents)
+        else:
+            return
+        translation_time = perf_counter() - start
 
-            #output_text_area.text = translate(text, "english", should_add_accents=should_add_accents)
+        if not worker.is_cancelled:
+            stats = f"{translation_time * 1e3:.1f}ms translating {translated_count}/{sentence_count} sentences"
+            self.call_from_thread(self.show_translation, translation, pronounciation_text, show_ipa, request, requested_at, stats)
+
+    def translate_sentences(self, worker, text, to, formal, should_add_accents):
+        """Translate `text` one sentence at a time, reusing the translation and IPA of every sentence that's already been translated.
+
+        Returns `(translation, ipa, how many sentences had to be translated, how many sentences there are)`.
+        If `worker` gets cancelled, it stops after the current batch of sentences and the translation is left unfinished.
+        """
+        sentences, separators = split_sentences(text.strip())
+        keys = [(sentence, to, formal, should_add_accents) for sentence in sentences]
+        results = {key: self.sentence_cache.get(key) for key in keys}
+
+        untranslated = [key for key, result in results.items() if result is None]
+        for start in range(0, len(untranslated), self.TRANSLATION_BATCH_SIZE):
+            if worker.is_cancelled:
+                return "", "", 0, len(keys)
+
+            batch = untranslated[start:start + self.TRANSLATION_BATCH_SIZE]
+            translations = translate_many([sentence for sentence, *_ in batch], to, formal, should_add_accents)
+            for key, translation in zip(batch, translations):
+                # the IPA of every sentence gets put together into one transcription, so leave out the slashes
+                ipa = get_ipa_pronounciation(translation)[1:-1] if to == "gorgus" else ""
+                results[key] = (translation, ipa)
+                self.sentence_cache.put(key, results[key])
+
+        translation = join_sentences([results[key][0] for key in keys], separators)
+        ipa = "/" + " ".join(results[key][1] for key in keys if results[key][1]) + "/"
+        return translation, ipa, len(untranslated), len(keys)
+
+    def show_translation(self, translation, pronounciation_text, show_ipa, request, requested_at, stats):
+        if request != self.translation_request: # the input changed while we were translating, a newer translation is coming
+            return
+
+        self.translation = translation
+        output_text_area = self.query_one("#output")
 
         if show_ipa:
-            pronounciation.update(pronounciation_text)
+            self.query_one("#pronounciation").update(pronounciation_text)
             output_text_area.update("[bold]" + self.translation + "[/bold]")
         else:
             output_text_area.text = self.translation
 
+        def log_latency():
+            log(f"Translation latency: {(perf_counter() - requested_at) * 1e3:.1f}ms from input to screen ({stats})")
+        self.call_after_refresh(log_latency)
+
     def compose(self) -> ComposeResult:
         self.deleting_settings = False
         settings = get_settings()
@@ -523,7 +622,7 @@ class GorgusTranslator(App):
                     yield Checkbox(label="Include informal words?", value=True, button_first=False, id="informal_words_checkbox")
                 yield Rule(line_style="dashed")
 
-                table = DataTable(id="dict-table")
+                table = VirtualTable(id="dict-table")
                 table.add_columns("Gorgus", "English", "Information")
 
                 
@@ -602,6 +701,12 @@ These are the people that make this possible! *(all of these are Discord usernam
                                  tooltip="Gorgus is more verbose, and looks a bit more like Latin."
                         )
 
+                    with Horizontal(classes="setting"):
+                        yield Label("Remember translations:")
+                        yield Checkbox(button_first=False, value=settings.get("persistent_translation_cache", False), id="persistent_translation_cache", classes="setting",
+                                 tooltip="Save translations to a file, so translating the same thing again (even after restarting) is instant."
+                        )
+
                     yield Label("Actions", variant="primary", classes="settings-title")
                     
                     yield Label("[dim]You can press the \"Update\" button when updates are available.[/dim]", classes="settings-note")
@@ -649,6 +754,9 @@ These are the people that make this possible! *(all of these are Discord usernam
         # get the user's settings
         settings = get_settings()
 
+        if settings.get("persistent_translation_cache", False):
+            enable_translation_cache()
+
         # check for updates if the user has the "check for updates on start" setting enabled
         try:
             self.query_one("#check_updates_on_start").value = settings["check_updates_on_start"]
@@ -664,6 +772,10 @@ These are the people that make this possible! *(all of these are Discord usernam
             )
 
     def on_ready(self):
+        if PROFILE_STARTUP: # the app is on the screen, so we're done starting up
+            self.exit()
+            return
+
         self.push_screen(MessageBox())
 
         
@@ -683,5 +795,14 @@ if __name__ == "__main__":
         os.system("clear")
 
     # start the app
+    startup_profiler.mark("app start")
     app = GorgusTranslator()
     app.run()
+
+    if PROFILE_STARTUP:
+        from rich import get_console
+
+        startup_profiler.finish()
+        startup_profiler.print_report(get_console())
+        if STARTUP_REPORT_PATH:
+            startup_profiler.save_report(STARTUP_REPORT_PATH)
@@ -0,0 +1,124 @@
+#
+#  phrase_matcher.py
+#
+
+# key used inside trie nodes to store the replacement for a phrase that ends at that node
+_MATCH = None
+
+
+def is_word_character(character):
+    """Same definition of a "word character" that `re` uses for `\\w`."""
+    return character.isalnum() or character == "_"
+
+
+def is_word_boundary(text, index):
+    """Python version of regex's `\\b`, checks if there's a word boundary right before `text[index]`."""
+    before = index > 0 and is_word_character(text[index - 1])
+    after = index < len(text) and is_word_character(text[index])
+    return before != after
+
+
+def fold_case(text):
+    """Lowercase `text` without changing its length, so indexes still line up with the original text."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+
+    # some characters (like "İ") turn into two characters when lowercased, leave those alone
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class PhraseMatcher:
+    """Replaces lots of phrases in a single left to right pass over some text.
+
+    All the phrases get compiled into a character trie once, so finding phrases
+    costs the same no matter how many phrases there are. When two matches overlap,
+    the phrase that was added first wins, just like running one `re.sub` per
+    phrase in order would.
+    """
+
+    def __init__(self, phrases=(), word_boundaries=True, ignore_case=True):
+        """
+        :param phrases: An iterable of `(phrase, replacement)` pairs, highest priority first.
+        :param word_boundaries: Only match whole phrases (like wrapping them in `\\b` in a regex).
+        :param ignore_case: Match phrases no matter their case.
+        """
+        self.word_boundaries = word_boundaries
+        self.ignore_case = ignore_case
+        self.root = {}
+        self.size = 0
+
+        for phrase, replacement in phrases:
+            self.add(phrase, replacement)
+
+    def add(self, phrase, replacement):
+        """Add a phrase, it will have a lower priority than every phrase added before it."""
+        if phrase == "":
+            return
+
+        if self.ignore_case:
+            phrase = fold_case(phrase)
+
+        node = self.root
+        for character in phrase:
+            node = node.setdefault(character, {})
+
+        if _MATCH not in node: # the same phrase was already added with a higher priority
+            node[_MATCH] = (self.size, replacement)
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def find_all(self, text):
+        """Yield every `(start, end, priority, replacement)` match in `text`, including overlapping ones."""
+        haystack = fold_case(text) if self.ignore_case else text
+        root = self.root
+        word_boundaries = self.word_boundaries
+        length = len(haystack)
+
+        for start in range(length):
+            node = root.get(haystack[start])
+            if node is None or (word_boundaries and not is_word_boundary(haystack, start)):
+                continue
+
+            end = start
+            while node is not None:
+                end += 1
+                if _MATCH in node and (not word_boundaries or is_word_boundary(haystack, end)):
+                    priority, replacement = node[_MATCH]
+                    yield start, end, priority, replacement
+
+                if end == length:
+                    break
+                node = node.get(haystack[end])
+
+    def replace(self, text):
+        """Replace every phrase in `text` with its replacement."""
+        if not self.root:
+            return text
+
+        matches = sorted(self.find_all(text), key=lambda match: (match[2], match[0]))
+        if not matches:
+            return text
+
+        # higher priority phrases get first pick, anything overlapping them is thrown out
+        taken = bytearray(len(text))
+        chosen = []
+        for start, end, priority, replacement in matches:
+            if any(taken[start:end]):
+                continue
+            taken[start:end] = b"\x01" * (end - start)
+            chosen.append((start, end, replacement))
+
+        chosen.sort()
+
+        output = []
+        last = 0
+        for start, end, replacement in chosen:
+            output.append(text[last:start])
+            output.append(replacement)
+            last = end
+        output.append(text[last:])
+
+        return ''.join(output)
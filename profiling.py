@@ -0,0 +1,159 @@
+#
+#  profiling.py
+#
+import os
+import sys
+import json
+import platform
+from time import perf_counter
+from contextlib import nullcontext
+from threading import Lock
+
+# returned by `StageTimer.stage` when timing is off, so a disabled stage is just a function call and an empty `with`
+_NOT_TIMING = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exception):
+        self.timer.record(self.name, perf_counter() - self.start)
+
+
+class StageTimer:
+    """Adds up how long each named stage of some work took, and how many times it ran.
+
+    Wrap a stage in `with timer.stage("name"):`. Stages can be nested, the outer stage's time includes
+    the inner stages. It starts off disabled, and while it's disabled stages aren't timed at all.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = Lock() # the app translates from worker threads
+        self.totals = {}
+        self.calls = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NOT_TIMING
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.totals.clear()
+            self.calls.clear()
+
+    def stats(self):
+        """Returns `name -> {"calls", "total", "mean"}` for every stage that ran, slowest (in total) first."""
+        with self.lock:
+            return {
+                name: {"calls": self.calls[name], "total": total, "mean": total / self.calls[name]}
+                for name, total in sorted(self.totals.items(), key=lambda item: item[1], reverse=True)
+            }
+
+
+def get_memory_usage():
+    """How much memory this process is using right now (in bytes), or `None` if we can't tell."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError: # windows
+        return None
+
+    # no /proc (like on macOS), the best we can do is the peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StartupProfiler:
+    """Records how long each phase of starting up takes, and how much memory it adds.
+
+    Call `mark("name")` whenever a new phase starts, which also ends the one before it.
+    It does nothing until `enable` is called, so the marks can stay in the code.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = [] # (name, seconds, memory added in bytes)
+        self.current = None
+
+    def enable(self):
+        self.enabled = True
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+
+        now = perf_counter()
+        memory = get_memory_usage()
+        self._end_phase(now, memory)
+        self.current = (name, now, memory)
+
+    def finish(self):
+        """End the last phase, returns the time everything took."""
+        if self.enabled:
+            self._end_phase(perf_counter(), get_memory_usage())
+        return sum(seconds for _, seconds, _ in self.phases)
+
+    def _end_phase(self, now, memory):
+        if self.current is None:
+            return
+
+        name, start, start_memory = self.current
+        self.phases.append((name, now - start, memory - start_memory if memory is not None and start_memory is not None else None))
+        self.current = None
+
+    def report(self):
+        """Everything that was recorded, as something that can be saved as JSON. Phases are slowest first."""
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total": sum(seconds for _, seconds, _ in self.phases),
+            "memory": get_memory_usage(),
+            "phases": [
+                {"name": name, "seconds": seconds, "memory": memory}
+                for name, seconds, memory in sorted(self.phases, key=lambda phase: phase[1], reverse=True)
+            ]
+        }
+
+    def print_report(self, console):
+        from rich.table import Table
+        from rich import box
+
+        report = self.report()
+        table = Table("Phase", "Time", "Share", "Memory", title="Startup Profile", box=box.ROUNDED)
+        for phase in report["phases"]:
+            table.add_row(
+                phase["name"],
+                f"{phase['seconds'] * 1e3:.1f}ms",
+                f"{phase['seconds'] / report['total'] * 100 if report['total'] else 0:.1f}%",
+                f"{phase['memory'] / 1024 / 1024:+.1f}MB" if phase["memory"] is not None else "?"
+            )
+        table.add_section()
+        table.add_row("Total", f"{report['total'] * 1e3:.1f}ms", "", f"{report['memory'] / 1024 / 1024:.1f}MB" if report["memory"] is not None else "?")
+        console.print(table)
+
+    def save_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+
+
+# shared by main.py and translater.py, so the app's startup and the translator's warm up end up in one profile
+startup_profiler = StartupProfiler()
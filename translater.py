@@ -42,22 +42,113 @@ def run_selected_tests(test_names):
     console.print(table)
 
 
+def print_cache_stats(title, stats):
+    table = Table("Size", "Hits", "Misses", "Evictions", "Hit Rate", title=title, box=box.ROUNDED)
+    table.add_row(
+        f"{stats['size']}/{stats['max_size']}",
+        str(stats["hits"]),
+        str(stats["misses"]),
+        str(stats["evictions"]),
+        f"{stats['hit_rate'] * 100:.1f}%"
+    )
+    console.print(table)
+
+def print_pipeline_timings(timings):
+    table = Table("Stage", "Calls", "Total", "Mean", title="Pipeline Timings", box=box.ROUNDED)
+    for name, timing in timings.items():
+        table.add_row(name, str(timing["calls"]), f"{timing['total'] * 1e3:.2f}ms", f"{timing['mean'] * 1e6:.1f}µs")
+    console.print(table)
+
+def translate_file(args):
+    """Translate a file (or stdin) line by line, writing every translation as soon as it's done."""
+    input_file = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+    output_file = sys.stdout if args.output_file is None else open(args.output_file, "w", encoding="utf-8", buffering=1024 * 1024)
+
+    # keep stdout clean for the translation
+    status_console = Console(stderr=True)
+
+    line_count = 0
+    sentence_count = 0
+    def read_lines():
+        nonlocal line_count, sentence_count
+        for line in input_file:
+            line = line.rstrip("\n")
+            line_count += 1
+            sentence_count += count_sentences(line)
+            yield line
+
+    start = time()
+    try:
+        for translated in translate_lines(read_lines(), args.output, args.formal, processes=args.processes):
+            output_file.write(translated + "\n")
+    finally:
+        output_file.flush()
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    elapsed = time() - start
+    status_console.print(
+        f"[bold bright_green]Done![/bold bright_green] Translated {line_count} lines ({sentence_count} sentences) in {elapsed:.2f}s, "
+        f"{sentence_count / elapsed if elapsed else 0:.1f} sentences per second.",
+        highlight=False
+    )
+
 def cli_translate(args):
     user_input = args.input
     output_lang = args.output
     formal = args.formal
 
+    if args.cache_size is not None:
+        set_analysis_cache_size(args.cache_size)
+
+    if args.persistent_cache is not None:
+        enable_translation_cache(args.persistent_cache or None)
+
+    if args.profile:
+        enable_pipeline_timings()
+
+    if args.file is not None:
+        translate_file(args)
+        if args.cache_stats:
+            print_cache_stats("Word Analysis Cache", get_analysis_cache_stats())
+        if args.profile:
+            print_pipeline_timings(get_pipeline_timings())
+        return
+
+    if user_input is None:
+        console.print("[red]Nothing to translate![/red] Give some text or use [bold]--file[/bold].")
+        exit(1)
+
     translated = translate(text=user_input, to=output_lang, formal=formal)
 
     print("\nTranslation: " + translated)
     if args.ipa:
         console.print(f"[dim]{get_ipa_pronounciation(translated)}[/dim]", highlight=False)
 
+    if args.cache_stats:
+        print_cache_stats("Word Analysis Cache", get_analysis_cache_stats())
+        if translation_cache is not None:
+            print_cache_stats("Translation Cache", get_translation_cache_stats())
+
+    if args.profile:
+        print_pipeline_timings(get_pipeline_timings())
+
 def cli_run_tests(args):
     console.print(Rule(title="[dim white]Running tests..."), style="dim")
     run_selected_tests(args.tests)
 
+def cli_build_morphology(args):
+    start = time()
+    table = build_morphology_table()
+    save_morphology_table(table, get_translations_hash(), get_tagger_hash())
+    console.print(f"[bold bright_green]Done![/bold bright_green] Analysed {len(table)} word forms in {round(time() - start, 2)}s.", highlight=False)
+
 def cli_inspect(args):
+    if args.profile:
+        enable_pipeline_timings()
+
     translation, inspection = from_gorgus(args.sentence)
 
     if not args.json: # text format
@@ -111,26 +202,60 @@ def cli_inspect(args):
         json.dump(inspection, f, indent=4)
         f.close()
 
+    if args.profile:
+        print_pipeline_timings(get_pipeline_timings())
+
+def cli_benchmark(args):
+    # benchmarks.py imports this module as "translater", make sure it gets this copy instead of loading everything again
+    sys.modules.setdefault("translater", sys.modules[__name__])
+    import benchmarks
+
+    passed = benchmarks.run_suite(
+        warmup=args.warmup,
+        repeats=args.repeats,
+        cold=args.cold,
+        only=args.only,
+        output=args.output,
+        baseline=args.baseline,
+        save_baseline=args.save_baseline,
+        threshold=args.threshold
+    )
+    if not passed:
+        exit(1)
+
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser(
         prog="Gorgus Translater",
         description="The CLI interface for the Gorgus Translator, you can translate text to and from Gorgus, run tests, etc..."
     )
 
+    arg_parser.add_argument("--profile-startup", action="store_true", help="Show how long each part of starting up took")
+    arg_parser.add_argument("--startup-report", metavar="PATH", help="Save the startup profile to PATH as JSON (implies --profile-startup)")
+
     subparsers = arg_parser.add_subparsers()
 
     # oh boy
     translate_parser = subparsers.add_parser("translate", help="Translate text to and from Gorgus", description="Translate text to and from Gorgus")
-    translate_parser.add_argument("input", help="The text input", type=str)
+    translate_parser.add_argument("input", help="The text input", type=str, nargs="?")
+    translate_parser.add_argument("--file", metavar="PATH", help="Translate a file line by line instead (\"-\" reads from stdin)")
+    translate_parser.add_argument("--output-file", metavar="PATH", help="Where to write the translated file (defaults to stdout)")
+    translate_parser.add_argument("--processes", type=int, help="How many processes to translate a file with (needs a platform that can fork)")
     translate_parser.add_argument("-o", "--output", type=str, help="The output language", default="gorgus", choices=["gorgus", "english"])
     translate_parser.add_argument("-f", "--formal", action="store_true", help="Enable formal speach")
     translate_parser.add_argument("--ipa", action="store_true", help="Include an IPA transcription if translating from English to Gorgus")
+    translate_parser.add_argument("--cache-size", type=int, help="How many word analyses to remember (0 turns the cache off)")
+    translate_parser.add_argument("--cache-stats", action="store_true", help="Show how well the caches did")
+    translate_parser.add_argument("--persistent-cache", nargs="?", const="", metavar="PATH", help="Save translations to disk and reuse them next time (optionally, where to save them)")
+    translate_parser.add_argument("--profile", action="store_true", help="Show how long each stage of translating took")
     translate_parser.set_defaults(func=cli_translate)
 
     tests_parser = subparsers.add_parser("run_tests", help="Run tests", description="Run tests")
-    tests_parser.add_argument("tests", nargs="*", default=["test_to_gorgus", "test_from_gorgus", "test_tense_detection", "test_translation_speed"])
+    tests_parser.add_argument("tests", nargs="*", default=["test_to_gorgus", "test_from_gorgus", "test_from_gorgus_without_inspection", "test_tense_detection", "test_phrase_matcher", "test_analysis_cache", "test_morphology_table", "test_gorgus_affixes", "test_translation_cache", "test_pipeline_timings", "test_compact_tagger", "test_pruned_tagger", "test_tagger_training", "test_translate_many", "test_translate_lines", "test_split_sentences"])
     tests_parser.set_defaults(func=cli_run_tests)
 
+    morphology_parser = subparsers.add_parser("build_morphology", help="Rebuild the morphology table", description="Analyse every form of every english word in the dictionary ahead of time, so translating them is faster")
+    morphology_parser.set_defaults(func=cli_build_morphology)
+
     inspect_parser = subparsers.add_parser("inspect", help="Inspect a Gorgus sentence to see how it is interpreted")
     inspect_parser.add_argument("sentence", help="The Gorgus sentence to inspect", type=str)
     inspect_parser.add_argument("--json", action="store_true", help="Output in JSON format")
@@ -140,8 +265,20 @@ if __name__ == '__main__':
     inspect_parser.add_argument("--translate", action="store_true", help="Include translation")
     inspect_parser.add_argument("--notes", action="store_true", help="Show additional interpretation notes")
     inspect_parser.add_argument("-o", "--output", type=str, help="Save output to file")
+    inspect_parser.add_argument("--profile", action="store_true", help="Show how long each stage of translating took")
     inspect_parser.set_defaults(func=cli_inspect)
 
+    benchmark_parser = subparsers.add_parser("benchmark", help="Run the benchmark suite", description="Measure how fast translating, inspecting and IPA transcription are, and compare it to a saved baseline")
+    benchmark_parser.add_argument("--only", nargs="+", choices=["to_gorgus", "from_gorgus", "get_ipa_pronounciation", "cli_inspect"], help="Only run some of the benchmarks")
+    benchmark_parser.add_argument("--warmup", type=int, default=2, help="How many untimed rounds to run first")
+    benchmark_parser.add_argument("--repeats", type=int, default=5, help="How many timed rounds to run")
+    benchmark_parser.add_argument("--cold", action="store_true", help="Clear the caches before every call")
+    benchmark_parser.add_argument("-o", "--output", type=str, default="benchmark_results.json", help="Where to save the results")
+    benchmark_parser.add_argument("--baseline", type=str, default="benchmark_baseline.json", help="The results to compare against")
+    benchmark_parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    benchmark_parser.add_argument("--threshold", type=float, default=0.2, help="How much slower (0.2 = 20%%) the median can get before it counts as a regression")
+    benchmark_parser.set_defaults(func=cli_benchmark)
+
     args = arg_parser.parse_args()
 
     try:
@@ -150,20 +287,35 @@ if __name__ == '__main__':
         print("You didn't provide a command!")
         arg_parser.print_usage()
         exit(1)
+
+    args.profile_startup = args.profile_startup or args.startup_report is not None
+    if args.profile_startup:
+        from profiling import startup_profiler
+        startup_profiler.enable()
+        startup_profiler.mark("translater imports")
 #endregion
 
+import os
 import re
-import unicodedata
-
-import nltk
-import inflect
+import sys
+import hashlib
+import multiprocessing
+import tempfile
 
 import unigram_tagger_model_trainer
 
+from cache import LRUCache, PersistentCache
+from compact_tagger import CompactTagger, save_compact_tagger
+from profiling import StageTimer, startup_profiler
+from util import remove_all_except
+from phrase_matcher import PhraseMatcher
+from ipa import get_ipa_pronounciation
+from affixes import analyze_gorgus_word
 from translations import *
-from word_forms.word_forms import get_word_forms
-from nltk.stem import WordNetLemmatizer, LancasterStemmer
 from typing import Literal
+from collections import namedtuple
+from threading import RLock
+from collections import deque
 from time import time
 
 from rich.console import Console
@@ -175,29 +327,164 @@ console = Console()
 
 ACTOR_SUFFIXES = ["er", "or", "ist"]
 
-console.print("[bold bright_green]INFO[/bold bright_green] Loaded translater dependencies!")
-console.print("[bold bright_green]INFO[/bold bright_green] Preparing thrases dictionary..")
+# Everything below gets loaded by `Translator.warm_up`, because loading it takes a few seconds. Every function that uses them
+# warms the translator up first. Use `translater.<name>` to get to them from other files, `from translater import <name>` would get the empty placeholder.
+nltk = None
+inflect_engine = None
+lemmatizer = None
+stemmer = None
+get_word_forms = None
+unigram_tagger = None
+wordnet_download_success = False
+
+sorted_phrases = []
+english_phrase_matcher = PhraseMatcher()
+gorgus_phrase_matcher = PhraseMatcher(word_boundaries=False, ignore_case=False)
+
+normalized_translation_dict = {}
+deaccented_translation_dict = {}
+no_accent_to_accented = {}
+reverse_mapping = {}
+english_to_gorgus = {}
+
+morphology_table = {}
 
-# First, sort phrases by length (longer phrases first)
-sorted_phrases = sorted(
-    phrase_translations.items(),
-    key=lambda item: max(len(p) for p in (item[1] if isinstance(item[1], list) else [item[1]])),
-    reverse=True
-)
+class Translator:
+    """The translation engine.
 
-console.print("[bold bright_green]INFO[/bold bright_green] Starting [bold]inflect[/bold] engine..")
+    Importing this module is fast, all the slow stuff (NLTK, the tagger, inflect, the morphology table, etc..)
+    only gets loaded the first time something is translated, or when `warm_up` is called.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.loading = False # building the morphology table while loading uses functions that warm up too
+        self.lock = RLock() # the app translates from worker threads, only one of them should warm up
+
+    def warm_up(self, verbose = False):
+        """Load everything the translator needs, if it hasn't been loaded yet. Set `verbose` to print every step."""
+        if self.ready:
+            return self
+
+        with self.lock:
+            if not self.ready and not self.loading:
+                self.loading = True
+                try:
+                    self.load(console.print if verbose else lambda *args, **kwargs: None)
+                finally:
+                    self.loading = False
+                self.ready = True
+
+        return self
+
+    def load(self, log):
+        global nltk, inflect_engine, lemmatizer, stemmer, get_word_forms, unigram_tagger, wordnet_download_success
+        global sorted_phrases, english_phrase_matcher, gorgus_phrase_matcher
+        global normalized_translation_dict, deaccented_translation_dict, no_accent_to_accented, reverse_mapping, english_to_gorgus
+        global morphology_table
+
+        log("[bold bright_green]INFO[/bold bright_green] Loading translater dependencies..")
+        startup_profiler.mark("import nltk")
+        import nltk
+        startup_profiler.mark("import inflect")
+        import inflect
+        startup_profiler.mark("import word_forms")
+        from word_forms.word_forms import get_word_forms
+        startup_profiler.mark("import nltk.stem")
+        from nltk.stem import WordNetLemmatizer, LancasterStemmer
+
+        log("[bold bright_green]INFO[/bold bright_green] Preparing phrases dictionary..")
+        startup_profiler.mark("phrases")
+
+        # First, sort phrases by length (longer phrases first)
+        sorted_phrases = sorted(
+            phrase_translations.items(),
+            key=lambda item: max(len(p) for p in (item[1] if isinstance(item[1], list) else [item[1]])),
+            reverse=True
+        )
+
+        # Compile every english phrase into one matcher so we can replace all of them in a single pass.
+        # Phrases keep the order above, but inside each entry the longer alternatives go first ("damn it" before "damn")
+        english_phrase_matcher = PhraseMatcher(
+            (phrase, gorgus)
+            for gorgus, english_phrases in sorted_phrases
+            for phrase in sorted(english_phrases if isinstance(english_phrases, list) else [english_phrases], key=len, reverse=True)
+        )
+
+        log("[bold bright_green]INFO[/bold bright_green] Starting [bold]inflect[/bold] engine..")
+        startup_profiler.mark("inflect engine")
+        inflect_engine = inflect.engine()
+
+        log("[bold bright_green]INFO[/bold bright_green] Loading [bold]NLTK[/bold] modules..")
+        startup_profiler.mark("nltk modules")
+        lemmatizer = WordNetLemmatizer()
+        stemmer = LancasterStemmer()
+
+        startup_profiler.mark("nltk data checks")
+
+        wordnet_download_success = nltk_download("corpora/wordnet.zip", "wordnet", log)
+        brown_download_success = nltk_download("corpora/brown.zip", "brown", log)
+        punkt_download_success = nltk_download("tokenizers/punkt_tab.zip", "punkt_tab", log)
+        tagger_download_success = nltk_download("taggers/averaged_perceptron_tagger_eng.zip", "averaged_perceptron_tagger_eng", log)
+        if not (wordnet_download_success and brown_download_success and punkt_download_success):
+            raise Exception("NLTK Resources Download Failed!")
+
+        log("[bold bright_green]INFO[/bold bright_green] Importing [bold]nltk.corpus[/bold]..")
+        startup_profiler.mark("import nltk.corpus")
+        import nltk.corpus
+        log("[bold bright_green]INFO[/bold bright_green] Getting [bold]NLTK Unigram Tagger[/bold]..")
+        startup_profiler.mark("tagger")
+        # the default tagger is not good, for some reason.
+        unigram_tagger = unigram_tagger_model_trainer.get_tagger_and_train_if_not_found(log)
+
+        # Ensure all dictionary values are lists for uniform processing
+        log("[bold bright_green]INFO[/bold bright_green] Normalising [bold]translations[/bold]..")
+        startup_profiler.mark("translations")
+        normalized_translation_dict = {k: ([v] if isinstance(v, str) else v) for k, v in translation_dictionary.items()}
+        deaccented_translation_dict = {remove_all_except(k): ([v] if isinstance(v, str) else v) for k, v in translation_dictionary.items()}
+        no_accent_to_accented = {}
+        reverse_mapping = {}
+        for norm_key in normalized_translation_dict:
+            deaccented = remove_all_except(norm_key)
+            reverse_mapping[norm_key] = deaccented
+            no_accent_to_accented[deaccented] = norm_key
+
+        # The gorgus side of the phrases, without accents (because from_gorgus removes them from the input), compiled into one matcher.
+        # Gorgus phrases can show up anywhere (not just as whole words) and the first phrase in the dictionary wins, same as str.replace.
+        gorgus_phrase_matcher = PhraseMatcher(
+            (
+                (remove_all_except(gorgus), english[0] if isinstance(english, list) else english)
+                for gorgus, english in phrase_translations.items()
+            ),
+            word_boundaries=False,
+            ignore_case=False
+        )
+
+        # Inverted index: english word -> (position in the dictionary, gorgus word).
+        # If an english word is used by more than one gorgus word, the first one in the dictionary wins.
+        english_to_gorgus = {}
+        for position, (key, value_list) in enumerate(normalized_translation_dict.items()):
+            for value in value_list:
+                english_to_gorgus.setdefault(value, (position, key))
 
-inflect_engine = inflect.engine()
+        log("[bold bright_green]INFO[/bold bright_green] Loading [bold]morphology table[/bold]..")
+        startup_profiler.mark("morphology table")
+        morphology_table = get_morphology_table_and_build_if_not_found(log)
 
-#console.print("[bold bright_green]INFO[/bold bright_green] Loading [bold]SpaCy[/bold] AI model..")
-#nlp = spacy.load("en_core_web_sm")
+    def translate(self, text, to: Literal["english", "gorgus"], formal = True, should_add_accents = True):
+        return translate(text, to, formal, should_add_accents)
 
-console.print("[bold bright_green]INFO[/bold bright_green] Loading [bold]NLTK[/bold] modules..")
-lemmatizer = WordNetLemmatizer()
-stemmer = LancasterStemmer()
-def nltk_download(packagePath, package) -> bool:
+    def from_gorgus(self, user_input: str, inspect = True):
+        return from_gorgus(user_input, inspect)
+
+    def to_gorgus(self, user_input, formal = True):
+        return to_gorgus(user_input, formal)
+
+translator = Translator()
+
+def nltk_download(packagePath, package, log = console.print) -> bool:
     try:
-        console.print(f"[dim]Checking for {package}...[/dim]", highlight=False)
+        log(f"[dim]Checking for {package}...[/dim]", highlight=False)
         nltk.data.find(packagePath)
         return True
     except LookupError:
@@ -214,96 +501,98 @@ def nltk_download(packagePath, package) -> bool:
             ssl._create_default_https_context = _create_unverified_https_context
         download_success = nltk.download(package)
         return download_success
-wordnet_download_success = nltk_download("corpora/wordnet.zip", "wordnet")
-brown_download_success = nltk_download("corpora/brown.zip", "brown")
-punkt_download_success = nltk_download("tokenizers/punkt_tab.zip", "punkt_tab")
-tagger_download_success = nltk_download("taggers/averaged_perceptron_tagger_eng.zip", "averaged_perceptron_tagger_eng")
-if not (wordnet_download_success and brown_download_success and punkt_download_success):
-    raise Exception("NLTK Resources Download Failed!")
 
-console.print("[bold bright_green]INFO[/bold bright_green] Importing [bold]nltk.corpus[/bold]..")
-import nltk.corpus
-console.print("[bold bright_green]INFO[/bold bright_green] Getting [bold]NLTK Unigram Tagger[/bold]..")
-# the default tagger is not good, for some reason.
-unigram_tagger = unigram_tagger_model_trainer.get_tagger_and_train_if_not_found()
 
+# we need to map the tags to only a few tags, cause rn they're too specific
+KNOWN_TAGS = {
+    "NOUN": ["NN", "NNS"],
+    "ADJECTIVE": ["JJ"],
+    "VERB": ["VB", "VBD", "VBG", "VBN", "VBP", "VBZ"],
+    "ADVERB": ["RBS"],
+    "ADPOSITION": ["IN"],
+    "PRONOUN": ["PRP"],
+    "PARTICLE": ["WRB"],
+    "DETERMINER": ["PRP$"]
+}
+SIMPLIFIED_TAGS = {tag: known_tag for known_tag, list_of_tags in KNOWN_TAGS.items() for tag in list_of_tags}
 
-def get_word_type(word):
-    if word.strip() == "":
-        return "UNKOWN"
-
-    # Process the word through the spaCy pipeline
-    #doc = nlp(word)
-    doc = nltk.tokenize.word_tokenize(word)
-    doc = nltk.pos_tag(doc)
-
-    # we need to map the tag to only a few tags, cause rn it's too specific
-    tag = doc[0][1]
-    KNOWN_TAGS = {
-        "NOUN": ["NN", "NNS"],
-        "ADJECTIVE": ["JJ"],
-        "VERB": ["VB", "VBD", "VBG", "VBN", "VBP", "VBZ"],
-        "ADVERB": ["RBS"],
-        "ADPOSITION": ["IN"],
-        "PRONOUN": ["PRP"],
-        "PARTICLE": ["WRB"],
-        "DETERMINER": ["PRP$"]
-    }
-    for known_tag, list_of_tags in KNOWN_TAGS.items():
-        if tag in list_of_tags:
-            tag = known_tag
-            break
+def tag_words(words):
+    """Tokenize and tag a whole sentence worth of words at once.
 
-    # Check if the word is a verb by examining the POS tag
-    try:
-        #return doc[0].pos_
-        return tag
-    except IndexError:
-        return "UNKOWN"
+    Each word is still tokenized and tagged on its own (so it gets the same tags as if
+    `get_word_type` or `detect_verb_tense` were called on it), but the taggers only get
+    called once for the whole sentence instead of once per word.
 
-def remove_all_except(text, accents_to_keep = {'\u0302', '\u0303', '\u0310', "\u0306"}):
+    Returns a list with one `(unigram_tagged_tokens, word_type)` tuple per word.
     """
-    Removes all diacritical marks except those in `accents_to_keep`.
-    
-    :param text: The input string containing diacritical marks.
-    :param accents_to_keep: A set of Unicode characters representing the accents to keep.
-    :return: The cleaned text with only the specified accents retained.
+    translator.warm_up()
+    with pipeline_timer.stage("tag.tokenize"):
+        tokenized_words = [nltk.word_tokenize(word) if word.strip() != "" else [] for word in words]
+
+    # the unigram tagger doesn't care about context, so we can tag every token in one go
+    all_tokens = [token for tokens in tokenized_words for token in tokens]
+    with pipeline_timer.stage("tag.unigram"):
+        unigram_tags = unigram_tagger.tag(all_tokens)
+
+    # the perceptron tagger does care about context, so every word is its own "sentence"
+    with pipeline_timer.stage("tag.perceptron"):
+        perceptron_tags = iter(nltk.pos_tag_sents([tokens for tokens in tokenized_words if tokens]))
+
+    tagged_words = []
+    offset = 0
+    for tokens in tokenized_words:
+        unigram_tagged = unigram_tags[offset:offset + len(tokens)]
+        offset += len(tokens)
+
+        if tokens:
+            tag = next(perceptron_tags)[0][1]
+            word_type = SIMPLIFIED_TAGS.get(tag, tag)
+        else:
+            word_type = "UNKOWN"
+
+        tagged_words.append((unigram_tagged, word_type))
+
+    return tagged_words
+
+def get_word_types(words):
+    """Same as `get_word_type`, but for a lot of words at once."""
+    return [word_type for _, word_type in tag_words(words)]
+
+def get_word_type(word):
+    return get_word_types([word])[0]
+
+def lookup_gorgus_word(*english_words):
+    """Find the gorgus word for the first dictionary entry that contains any of `english_words`.
+
+    Falsey words are ignored, returns `None` if nothing was found.
     """
-    # Normalize text to decomposed form (NFD)
-    normalized_text = unicodedata.normalize('NFD', text)
-    # Keep only base characters and the specified accents
-    cleaned_text = ''.join(c for c in normalized_text if unicodedata.category(c) != 'Mn' or c in accents_to_keep)
-    return cleaned_text
-
-# Ensure all dictionary values are lists for uniform processing
-console.print("[bold bright_green]INFO[/bold bright_green] Normalising [bold]translations[/bold]..")
-normalized_translation_dict = {k: ([v] if isinstance(v, str) else v) for k, v in translation_dictionary.items()}
-deaccented_translation_dict = {remove_all_except(k): ([v] if isinstance(v, str) else v) for k, v in translation_dictionary.items()}
-no_accent_to_accented = {}
-reverse_mapping = {}
-for norm_key in normalized_translation_dict:
-    deaccented = remove_all_except(norm_key)
-    reverse_mapping[norm_key] = deaccented
-    no_accent_to_accented[deaccented] = norm_key
+    translator.warm_up()
+    best = None
+    for english_word in english_words:
+        if not english_word:
+            continue
+        entry = english_to_gorgus.get(english_word)
+        if entry is not None and (best is None or entry[0] < best[0]):
+            best = entry
+    return best[1] if best else None
 
 def detect_verb_tense(verb, previous_word = None):
+    translator.warm_up()
+    tokenized_verb = nltk.word_tokenize(((previous_word + " ") if previous_word else "") + verb)
+    return verb_tense_from_tags(unigram_tagger.tag(tokenized_verb), previous_word)
+
+def verb_tense_from_tags(tagged_verb, previous_word = None):
+    """Figure out the tense of a verb from its unigram tags (and the tags of the word before it, if there is one)."""
     try:
-        #print(nltk.pos_tag(nltk.word_tokenize("The quick brown fox " + verb + " over the lazy dog.")))
-        tokenized_verb = nltk.word_tokenize(((previous_word + " ") if previous_word else "") + verb)
-        tagged_verb = unigram_tagger.tag(tokenized_verb)
         _verb = tagged_verb[len(tagged_verb) - 1][1]
-        #print(verb)
-        #print(tagged_verb)
-        #print(_verb)
-        #raise Exception("stop!")
     except IndexError:
         return "norm"
     
     if (_verb == "VBD"):
         return "past"
     if _verb == "VB":
-        if previous_word or len(tokenized_verb) != 1:
-            if tagged_verb[0][1] == "MD" and tokenized_verb[0] == "will":
+        if previous_word or len(tagged_verb) != 1:
+            if tagged_verb[0][1] == "MD" and tagged_verb[0][0] == "will":
                 return "futr"
         return "norm"
     if (_verb == "VBG"):
@@ -311,20 +600,6 @@ def detect_verb_tense(verb, previous_word = None):
     if (_verb == "VBN"):
         return "past"
     return "norm"
-    # if (
-    #     sent.root.tag_ == "VBD" or
-    #     any(w.dep_ == "aux" and w.tag_ == "VBD" for w in sent.root.children)):
-    #     return "past"
-    #
-    # if (
-    #     sent.root.tag_ == "VBG" or
-    #     any(w.dep_ == "aux" and w.tag_ == "VBZ" for w in sent.root.children)):
-    #     return "cont"
-    #
-    # if previous_word and previous_word in ["will", "shall"]:
-    #     return "futr"
-    #
-    # return "norm"
 
 def get_past_tense_verb(verb):
     """
@@ -430,6 +705,7 @@ def from_actor_form(actor, lemma = True):
     """
     Convert an actor form word back to its root.
     """
+    translator.warm_up()
     # if wordnet is not available we have to make compromises
     if not wordnet_download_success: return actor
     #! I AM AWARE THIS IS COMPLETE AND UTTER DOGSHIT!!!!
@@ -440,7 +716,7 @@ def from_actor_form(actor, lemma = True):
     forms = list(get_word_forms(actor)["v"])
     try:
         if lemma:
-            return LancasterStemmer().stem(forms[0])
+            return stemmer.stem(forms[0])
             #return nlp(forms[0])[0].lemma_
         return forms[0]
     except IndexError:
@@ -455,6 +731,7 @@ def get_trailing_punctuation(text, ignore_chars=""):
     return remove_all_except(match.group(0) if match else '')
 
 def convert_to_base_form(verb):
+    translator.warm_up()
     if verb in ["is", "are"]: # some words will cause issues if converted to base form
         return verb
 
@@ -463,108 +740,384 @@ def convert_to_base_form(verb):
     else:
         return verb
 
-def create_ipa_dict(consonants):
-    ipa_dict = {}
-    for ipa, romanizations in consonants.items():
-        for roman in romanizations:
-            ipa_dict[roman] = ipa
-    return ipa_dict
-
-def get_ipa_pronounciation(gorgus: str):
-    consonants = {
-        "lʊː": ["lu"],
-        "ʃ": ["sh", "ćh"],
-        "O": ["oe", "ó"],
-        "l": ["l", "ll"],
-        "iː": ["ee", "é", "ea"],
-        "h": ["h"],
-        "ɜː": ["er", "ur"],
-        "ɔɹ": ["or"],
-        "tʃ": ["ch"],
-        "ʌ": ["u"],
-        "ʊː": ["oo", "ú"],
-        "ɔ": ["o"],
-        "iːkO": ["eeko"],
-        "ʤ": ["j"],
-        "ɔɹʤ": ["orge"],
-        "ɹ": ["r"],
-        "f": ["f", "ff"],
-        "kw": ["q", "qu"],
-        "ɔɹs": ["ors", "orse"],
-        "ŋg": ["nġ"],
-        "iŋg": ["ing"],
-        "ŋ": ["ng"],
-        "oŋk": ["onk"],
-        "t": ["t", "tt"],
-        "ɑːɹ": ["ar", "å"],
-        "k": ["k", "c", "ck"],
-        "g": ["g", "gg"],
-        "ɛ": ["è"],
-        "R": ["ŕ̈"], # r trill
-        "e͡ɪ": ["ae", "ä", "â", "ai", "ay"],
-        "ɪ": ["i"],
-        "ɪŋk": ["ink"],
-        "eŋk": ["enk"],
-        "θ": ["th"],
-        "e͡ɪv": ["ave"],
-        "j": ["y"],
-        "ks": ["x"],
-        "lʌ̌ŋk": ["lunk"], # questions have a rising tone
-        "iːnO": ["ino"],
-        "vɪŋ": ["ving"],
-        "Oʊʤ": ["oge"],
-        "ɹs": ["rse"],
-        "aɪk": ["ike"],
-        "aɪd": ["ide", "ied"],
-        "kχ": ["ç"],
-        "m": ["m", "mm", "mmm"],
-        "ː": [translation_dictionary["<EXAGGERATED_VERB>"]], # exaggerated vowel
-        "\u0324˨˩": [translation_dictionary["<GENTLE_VERB>"]], # gentle
-        "": ['a̱', 'ḇ', 'c̱', 'ḏ', 'e̱', 'f̱', 'g̱', 'ẖ', 'i̱', 'j̱', 'ḵ', 'ḻ', 'm̱', 'ṉ', 'o̱', 'p̱', 'q̱', 'ṟ', 's̱', 'ṯ', 'u̱', 'v̱', 'w̱', 'x̱', 'y̱', 'ẕ'] # silent letters
-    }
+def remove_between_last_two_spaces(s):
+    parts = s.rsplit(" ", 2)  # Split into up to 3 parts from the right
+    if len(parts) < 3:
+        return s  # Not enough spaces to remove anything
+    return parts[0] + " " + parts[2]  # Keep first and last parts, remove the middle
+
+ENGLISH_PUNCTUATION_TABLE = str.maketrans('', '', "?.!,\":()=/\\$[]")
+
+# words that to_gorgus skips completely
+SKIPPED_ENGLISH_WORDS = {"EXAGGERATE", "GENTLE", "MORE", "LESS"}
+
+# Everything to_gorgus needs to know about an english word to translate it, `key` is `None` if the word isn't in the dictionary
+EnglishWordAnalysis = namedtuple("EnglishWordAnalysis", ["key", "is_plural", "is_actor", "tense", "word_type"])
 
-    # Invert dictionary
-    ipa_dict = create_ipa_dict(consonants)
+# stored in place of an analysis when inflect can't handle a word
+FAILED_ANALYSIS = "FAILED"
 
-    gorgus = gorgus.replace(",", " |").replace(".", " ‖").replace("!", " ‖")
-    gorgus = gorgus.translate(str.maketrans('', '', "?!\":()=/\\$[]"))
-    gorgus = gorgus.lower().replace("-", "").replace("'", ".")
+#region Pipeline timings
+# How long every stage of translating takes (phrase replacement, inflect, tagging, lookups, post-passes..), added up over every translation.
+# Timing is off unless someone turns it on, and a stage that isn't being timed costs about as much as an empty function call.
+pipeline_timer = StageTimer()
+
+def enable_pipeline_timings():
+    """Start timing every stage of `to_gorgus`, `from_gorgus` and `translate`.
+
+    Translations done by a translation pool's worker processes don't get counted.
+    """
+    pipeline_timer.enabled = True
+
+def disable_pipeline_timings():
+    """Stop timing, the timings so far are kept."""
+    pipeline_timer.enabled = False
+
+def reset_pipeline_timings():
+    pipeline_timer.reset()
+
+def get_pipeline_timings():
+    """Get the calls, total time and mean time (in seconds) of every stage that has been timed, slowest first."""
+    return pipeline_timer.stats()
+#endregion
 
-    words = gorgus.split()  # Split into words
-    ipa_output = []
+# Real text uses the same words over and over again, so we remember the analysis of the most recent ones
+analysis_cache = LRUCache(4096)
+
+def set_analysis_cache_size(size):
+    """Change how many word analyses are remembered, `0` turns the cache off."""
+    analysis_cache.resize(size)
+
+def get_analysis_cache_stats():
+    """Get the hits, misses, evictions, etc. of the word analysis cache."""
+    return analysis_cache.stats()
+
+def get_analysis_cache_key(word, previous_word):
+    """The previous word only changes a word's analysis if it starts with "will" (future tense) or the word is empty."""
+    if word.strip() == "" or (previous_word and previous_word.startswith("will")):
+        return word, previous_word
+    return word, bool(previous_word)
+
+def inflect_english_word(word):
+    """Returns `(plural, singular, is_plural)`, or `None` if inflect can't handle the word."""
+    translator.warm_up()
+    try:
+        plural = inflect_engine.plural(word)
+        if not word in ignored_plurals:
+            singular = inflect_engine.singular_noun(word)
+        else:
+            singular = False
+        is_plural = singular != False
+    except:
+        return None
+
+    return plural, singular, is_plural
+
+def finish_english_word_analysis(word, inflected, tagged_word, previous_word, previous_tags):
+    translator.warm_up()
+    plural, singular, is_plural = inflected
+    unigram_tags, word_type = tagged_word
+
+    is_actor = word not in ignored_actor_nouns and (
+        is_actor_form(word) or "erser" in to_actor_form(word)
+    )
+
+    if is_actor:
+        singular = from_actor_form(word)
+        plural = inflect_engine.plural(from_actor_form(plural))
     
-    for word in words:
-        ipa_word = word
+    if is_actor and singular == plural:
+        is_plural = True
+        singular = to_actor_form(singular)
+        plural = inflect_engine.plural(singular)
+
+    if plural in ignored_plurals:
+        is_plural = False
+
+    # we need to figure out what tense the verb is in :DDDDD (this is fucking painful, we also only use this if the word is a verb)
+    tense = verb_tense_from_tags(previous_tags + unigram_tags, previous_word)
+    with pipeline_timer.stage("to_gorgus.lemmatize"):
+        base_word = convert_to_base_form(word)
 
-        for roman, ipa in sorted(ipa_dict.items(), key=lambda x: -len(x[0])):  # Sort by length (longest first)
-            ipa_word = ipa_word.replace(roman, ipa)
+    with pipeline_timer.stage("to_gorgus.lookup"):
+        if word_type == "VERB":
+            key = lookup_gorgus_word(base_word)
+        else:
+            key = lookup_gorgus_word(singular, word, is_plural and plural)
 
-        ipa_output.append(ipa_word)
+    return EnglishWordAnalysis(key, is_plural, is_actor, tense, word_type)
 
-    return "/" + ' '.join(ipa_output).replace("R", "r").replace("O", "o") + "/"
+def analyze_english_words(words):
+    """Analyze every word in a sentence (that has already had its phrases replaced).
 
-def remove_between_last_two_spaces(s):
-    parts = s.rsplit(" ", 2)  # Split into up to 3 parts from the right
-    if len(parts) < 3:
-        return s  # Not enough spaces to remove anything
-    return parts[0] + " " + parts[2]  # Keep first and last parts, remove the middle
+    Returns the words without punctuation, and a list with one analysis per word. The analysis is
+    `None` for words that are skipped, and `FAILED_ANALYSIS` for words inflect can't handle.
+    Only words that aren't in the analysis cache get tagged, and they all get tagged at once.
+    """
+    return analyze_english_sentences([words])[0]
+
+def analyze_english_sentences(sentences):
+    """Same as `analyze_english_words`, but for a lot of sentences (lists of words) at once.
+
+    Returns one `(cleaned_words, analyses)` tuple per sentence. Every new word in every sentence gets tagged in one go,
+    and a word that shows up in more than one sentence only gets analysed once.
+    """
+    translator.warm_up()
+    all_cleaned_words = [[word.translate(ENGLISH_PUNCTUATION_TABLE) for word in words] for words in sentences]
+    all_analyses = [[None] * len(words) for words in sentences]
+
+    # cache key -> (inflected, (sentence, index of the word), (sentence, index of the previous word), every (sentence, index) using this key)
+    pending = {}
+    for sentence, (words, cleaned_words, analyses) in enumerate(zip(sentences, all_cleaned_words, all_analyses)):
+        previous_index = None
+        for i, word in enumerate(cleaned_words):
+            if words[i] == "the" or word in SKIPPED_ENGLISH_WORDS: # skip "the", there is no equivelant in gorgus
+                continue
+
+            previous_word = cleaned_words[previous_index] if previous_index is not None else None
+            key = get_analysis_cache_key(word, previous_word)
+
+            if key in pending:
+                pending[key][3].append((sentence, i))
+                analysis = pending[key]
+            else:
+                # the morphology table only knows about words on their own, which is fine unless the previous word is "will"
+                analysis = morphology_table.get(word) if isinstance(key[1], bool) else None
+                if analysis is None:
+                    analysis = analysis_cache.get(key)
+                    if analysis is None:
+                        with pipeline_timer.stage("to_gorgus.inflect"):
+                            inflected = inflect_english_word(word)
+                        if inflected is None:
+                            analysis = FAILED_ANALYSIS
+                            analysis_cache.put(key, analysis)
+                        else:
+                            previous = (sentence, previous_index) if previous_index is not None else None
+                            analysis = pending[key] = (inflected, (sentence, i), previous, [(sentence, i)])
+
+            analyses[i] = analysis
+            if analysis is not FAILED_ANALYSIS:
+                previous_index = i
+
+    if pending:
+        # tag the new words (and the words before them, for the tense) in one go
+        positions_to_tag = sorted({position for _, position, _, _ in pending.values()} | {previous for _, _, previous, _ in pending.values() if previous is not None})
+        tagged_words = dict(zip(positions_to_tag, tag_words([all_cleaned_words[sentence][i] for sentence, i in positions_to_tag])))
+
+        for key, (inflected, (sentence, i), previous, positions) in pending.items():
+            previous_word = all_cleaned_words[previous[0]][previous[1]] if previous is not None else None
+            previous_tags = tagged_words[previous][0] if previous_word else []
+
+            with pipeline_timer.stage("to_gorgus.word_analysis"):
+                analysis = finish_english_word_analysis(all_cleaned_words[sentence][i], inflected, tagged_words[(sentence, i)], previous_word, previous_tags)
+            analysis_cache.put(key, analysis)
+            for position_sentence, index in positions:
+                all_analyses[position_sentence][index] = analysis
+
+    return list(zip(all_cleaned_words, all_analyses))
+
+#region Morphology table
+# Every form of every english word in the dictionary (plurals, past tense, actor nouns, etc..) gets analysed ahead of time
+# and saved to this file, so translating a word we know about is just one dictionary lookup.
+MORPHOLOGY_TABLE_FILE = "morphology_table.json"
+MORPHOLOGY_TABLE_VERSION = 1 # bump this whenever the way words are analysed changes
+
+def get_translations_hash():
+    """A hash of the tables in translations.py that change how words are translated. It changes whenever the dictionary is edited."""
+    tables = [translation_dictionary, phrase_translations, word_features, ignored_plurals, ignored_actor_nouns]
+    return hashlib.sha256(json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def get_tagger_hash():
+    """A hash of the saved tagger. The tenses and word types it picks end up in the morphology table, so retraining it changes them."""
+    try:
+        with open(unigram_tagger_model_trainer.get_tagger_path(), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def get_surface_forms(english):
+    """Get every form of an english word that to_gorgus should be able to translate."""
+    translator.warm_up()
+    if not english.replace("'", "").isalpha(): # things like "?" don't have any other forms
+        return {english}
+
+    forms = {english, convert_to_base_form(english), convert_to_gerund(english)}
+
+    if len(english) > 1:
+        forms.add(get_past_tense_verb(english))
+
+    if english not in ignored_plurals:
+        forms.add(inflect_engine.plural(english))
+        singular = inflect_engine.singular_noun(english)
+        if singular:
+            forms.add(singular)
+
+    if english not in ignored_actor_nouns:
+        actor = to_actor_form(english)
+        forms.add(actor)
+        forms.add(inflect_engine.plural(actor))
+        if is_actor_form(english):
+            forms.add(from_actor_form(english, lemma=False))
+
+    return forms
+
+def get_dictionary_surface_forms():
+    """Get every form of every (single word) english word in the dictionary."""
+    translator.warm_up()
+    forms = set()
+    for value_list in normalized_translation_dict.values():
+        for english in value_list:
+            if " " in english or english.strip() == "" or english != english.lower():
+                continue
+            forms.update(get_surface_forms(english))
+
+    return {form for form in forms if form and " " not in form}
+
+# brown corpus tags of the kinds of words a dictionary can have (nouns, proper nouns, verbs, adjectives, adverbs and numbers), everything else is a function word
+OPEN_CLASS_TAGS = ("NN", "NP", "VB", "JJ", "RB", "CD")
+
+def get_tagger_vocabulary(word_to_tag):
+    """The words of a tagger (`word -> tag`) the translator actually needs, used to prune the tagger.
+
+    That's every form of every english word in the dictionary, every word the lemmatizer turns into a dictionary word
+    (like "children"), every verb (irregular ones like "slept" can't be generated from the dictionary, and tense detection
+    needs all of them) and every function word, because tense detection looks at the word before a verb too.
+    """
+    translator.warm_up()
+    dictionary_words = {english for value_list in normalized_translation_dict.values() for english in value_list}
+
+    vocabulary = set()
+    for text in get_dictionary_surface_forms() | dictionary_words:
+        vocabulary.update(nltk.word_tokenize(text))
+        vocabulary.update(nltk.word_tokenize(text.capitalize()))
+
+    for word, tag in word_to_tag.items():
+        if tag is None or word in vocabulary:
+            continue
+
+        if tag.startswith("VB") or not tag.startswith(OPEN_CLASS_TAGS):
+            vocabulary.add(word)
+        elif wordnet_download_success and any(lemmatizer.lemmatize(word.lower(), pos) in dictionary_words for pos in "nar"):
+            vocabulary.add(word)
+
+    return vocabulary
+
+def build_morphology_table():
+    """Analyse every form of every english word in the dictionary. This takes a while, which is why the result gets saved."""
+    translator.warm_up()
+    # words that start with "will" can be future tense on their own, so they depend on the words around them
+    forms = sorted(form for form in get_dictionary_surface_forms() if not form.startswith("will"))
+
+    table = {}
+    tagged_forms = tag_words(forms)
+    for form, tagged_form in zip(forms, tagged_forms):
+        inflected = inflect_english_word(form)
+        if inflected is None:
+            continue
+        table[form] = finish_english_word_analysis(form, inflected, tagged_form, None, [])
+
+    return table
+
+def save_morphology_table(table, translations_hash, tagger_hash):
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), MORPHOLOGY_TABLE_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": MORPHOLOGY_TABLE_VERSION,
+            "translations_hash": translations_hash,
+            "tagger_hash": tagger_hash,
+            "forms": {form: list(analysis) for form, analysis in table.items()}
+        }, f, ensure_ascii=False)
+
+def load_morphology_table(translations_hash, tagger_hash):
+    """Load the saved morphology table, returns `None` if there isn't one or it's out of date."""
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), MORPHOLOGY_TABLE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != MORPHOLOGY_TABLE_VERSION or data.get("translations_hash") != translations_hash or data.get("tagger_hash") != tagger_hash:
+        return None
+
+    return {form: EnglishWordAnalysis(*analysis) for form, analysis in data["forms"].items()}
+
+def get_morphology_table_and_build_if_not_found(log = console.print):
+    translations_hash = get_translations_hash()
+    tagger_hash = get_tagger_hash()
+    table = load_morphology_table(translations_hash, tagger_hash)
+
+    if table is None:
+        log("[bold bright_green]INFO[/bold bright_green] Morphology table is missing or out of date, building it (this only happens once)..")
+        table = build_morphology_table()
+        try:
+            save_morphology_table(table, translations_hash, tagger_hash)
+        except OSError:
+            console.print("[bold orange1]Warning![/bold orange1] Couldn't save the morphology table, it will be rebuilt next time.")
+
+    return table
+
+#endregion
+
+def replace_phrases(matcher, texts):
+    """Replace the phrases in a lot of texts with a single pass of `matcher`, instead of one pass per text."""
+    if len(texts) == 1 or any("\n" in text for text in texts):
+        return [matcher.replace(text) for text in texts]
+
+    # phrases never have newlines in them, so they can't match across two texts
+    return matcher.replace("\n".join(texts)).split("\n")
 
 def to_gorgus(user_input, formal = True):
-    translated = ""
-    before_translation = user_input
+    return to_gorgus_many([user_input], formal)[0]
 
-    #user_input = swap_verbs_nouns(user_input)
-    
-    # Replace phrases with gorgus words      
-    for gorgus, english_phrases in sorted_phrases:
-        if isinstance(english_phrases, str):
-            english_phrases = [english_phrases]  # Ensure it's a list
-        for phrase in english_phrases:
-            # Use regex to match whole phrase boundaries
-            pattern = r'\b' + re.escape(phrase) + r'\b'
-            user_input = re.sub(pattern, gorgus, user_input, flags=re.IGNORECASE)
-   
-    words = user_input.split(" ")
+def to_gorgus_many(user_inputs, formal = True):
+    """Translate a list of english texts to gorgus, analysing all of their words at once."""
+    translator.warm_up()
+
+    with pipeline_timer.stage("to_gorgus"):
+        #user_inputs = [swap_verbs_nouns(user_input) for user_input in user_inputs]
+
+        # Replace phrases with gorgus words (longest phrase wins)
+        with pipeline_timer.stage("to_gorgus.phrases"):
+            sentences = [user_input.split(" ") for user_input in replace_phrases(english_phrase_matcher, user_inputs)]
+
+        with pipeline_timer.stage("to_gorgus.analysis"):
+            analyzed_sentences = analyze_english_sentences(sentences)
+
+        with pipeline_timer.stage("to_gorgus.assemble"):
+            return [
+                assemble_gorgus(words, cleaned_words, analyses, formal)
+                for words, (cleaned_words, analyses) in zip(sentences, analyzed_sentences)
+            ]
+
+def add_gorgus_tokens(tokens, text):
+    """Add `text` (and a space) to the end of a translation that's being put together as a list of tokens."""
+    tokens.extend(text.split(" "))
+
+def remove_last_gorgus_token(tokens):
+    """Remove the last word of a translation that's being put together as a list of tokens.
+
+    Same as `' '.join(translated.strip().split(' ')[:-1]) + " "` on the translation as a string, but it
+    only has to look at the end of the list (and the start, if it's whitespace) instead of copying the whole thing.
+    """
+    while tokens and tokens[-1].strip() == "":
+        tokens.pop()
+    if tokens:
+        tokens.pop()
+
+    # the start of the translation gets stripped too
+    start = 0
+    while start < len(tokens) and tokens[start].strip() == "":
+        start += 1
+    if start:
+        del tokens[:start]
+    if tokens:
+        tokens[0] = tokens[0].lstrip()
+    else:
+        tokens.append("")
+
+def assemble_gorgus(words, cleaned_words, analyses, formal):
+    """Put the gorgus translation of a sentence together, once all of its words have been analysed."""
+    # the translation so far is `' '.join(tokens) + " "`, so removing the last word doesn't mean rebuilding the whole string
+    tokens = []
 
     modified_verbs = {}
 
@@ -575,20 +1128,17 @@ def to_gorgus(user_input, formal = True):
         elif token.text == "GENTLE":
             modified_verbs[token.head.i] = -1"""
 
-    previous_english_word = None
     for i, word in enumerate(words): 
-        if word == "the": # skip "the", there is no equivelant in gorgus
+        analysis = analyses[i]
+        if analysis is None: # skipped word
             continue
 
         trailing_punctuation = get_trailing_punctuation(word, translation_dictionary["<EXAGGERATED_VERB>"] + translation_dictionary["<GENTLE_VERB>"] + translation_dictionary["<MORE_VERB>"] + translation_dictionary["<LESS_VERB>"])
-        word = word.translate(str.maketrans('', '', "?.!,\":()=/\\$[]"))
+        word = cleaned_words[i]
 
         suffix = ""
         punctuation_suffix = ""
 
-        if word == "EXAGGERATE" or word == "GENTLE" or word == "MORE" or word == "LESS":
-            continue
-
         suffix: str = modified_verbs.get(i, "")
         if suffix == 1:
             suffix = translation_dictionary["<EXAGGERATED_VERB>"]
@@ -605,74 +1155,38 @@ def to_gorgus(user_input, formal = True):
         else:
             punctuation_suffix += trailing_punctuation
 
-        try:
-            plural = inflect_engine.plural(word)
-            if not word in ignored_plurals:
-                singular = inflect_engine.singular_noun(word)
-            else:
-                singular = False
-            is_plural = singular != False
-        except:
-            translated += f"{words[i]} "
+        if analysis is FAILED_ANALYSIS:
+            add_gorgus_tokens(tokens, words[i])
             continue
         
-        word_suffix = ""
-        is_actor = False
-
-        is_actor = word not in ignored_actor_nouns and (
-            is_actor_form(word) or "erser" in to_actor_form(word)
-        )
-
-        if is_actor:
-            singular = from_actor_form(word)
-            plural = inflect_engine.plural(from_actor_form(plural))
-
-            word_suffix += translation_dictionary["<ACTOR>"]
-        
-        if is_actor and singular == plural:
-            is_plural = True
-            singular = to_actor_form(singular)
-            plural = inflect_engine.plural(singular)
-
-        if plural in ignored_plurals:
-            is_plural = False
-
-        # we need to figure out what tense the verb is in :DDDDD (this is fucking painful, we also only use this if the word is a verb)
-        tense = detect_verb_tense(word, previous_english_word)
-        word_type = get_word_type(word)
-        base_word = convert_to_base_form(word)
+        word_suffix = translation_dictionary["<ACTOR>"] if analysis.is_actor else ""
+        tense = analysis.tense
+        word_type = analysis.word_type
 
         if tense == "futr": # remove the last word
-            translated = ' '.join(translated.strip().split(' ')[:-1]) + " "
+            remove_last_gorgus_token(tokens)
 
-        found = False
-        for key, value_list in normalized_translation_dict.items():
-            
-            value_set = set(value_list)  # Convert to set for faster lookups
-            
-            if (word_type != "VERB" and ((singular and singular in value_set) or (word in value_set) or (is_plural and plural in value_set))) or (word_type == "VERB" and base_word in value_set):
-                found = True
-                plural_prefix = translation_dictionary["<PLURAL>"] if is_plural else ""
-                tense_suffix = translation_dictionary.get(f"<{tense.upper()}_TENSE>", "") #if word_type == "VERB" else ""
-                word_type_suffix = translation_dictionary. get(f"<{word_type.upper()}>", "") if formal else ""
-                
-                translated += f"{plural_prefix}{key}{word_type_suffix}{word_suffix}{suffix}{tense_suffix}{punctuation_suffix} "
-                break
+        if analysis.key is not None:
+            plural_prefix = translation_dictionary["<PLURAL>"] if analysis.is_plural else ""
+            tense_suffix = translation_dictionary.get(f"<{tense.upper()}_TENSE>", "") #if word_type == "VERB" else ""
+            word_type_suffix = translation_dictionary. get(f"<{word_type.upper()}>", "") if formal else ""
 
-        if not found:
-            translated += f"{word}{suffix}{punctuation_suffix} "
+            add_gorgus_tokens(tokens, f"{plural_prefix}{analysis.key}{word_type_suffix}{word_suffix}{suffix}{tense_suffix}{punctuation_suffix}")
+        else:
+            add_gorgus_tokens(tokens, f"{word}{suffix}{punctuation_suffix}")
 
-        previous_english_word = word
+    translated = " ".join(tokens) + " " if tokens else ""
 
     # Replace verb modifier words
-    for word in ["really", "extremely", "very", "absolutely"]:
-        translated = replace_word(translated, word, translation_dictionary["<EXAGGERATED_VERB>"])
-    for word in ["kinda", "slightly", "somewhat"]:
-        translated = replace_word(translated, word, translation_dictionary["<GENTLE_VERB>"])
-    for word in ["more"]:
-        translated = replace_word(translated, word, translation_dictionary["<MORE_VERB>"])
-    for word in ["less"]:
-        translated = replace_word(translated, word, translation_dictionary["<LESS_VERB>"])
+    with pipeline_timer.stage("to_gorgus.replace_word"):
+        for word in ["really", "extremely", "very", "absolutely"]:
+            translated = replace_word(translated, word, translation_dictionary["<EXAGGERATED_VERB>"])
+        for word in ["kinda", "slightly", "somewhat"]:
+            translated = replace_word(translated, word, translation_dictionary["<GENTLE_VERB>"])
+        for word in ["more"]:
+            translated = replace_word(translated, word, translation_dictionary["<MORE_VERB>"])
+        for word in ["less"]:
+            translated = replace_word(translated, word, translation_dictionary["<LESS_VERB>"])
 
     return translated
 
@@ -734,7 +1248,35 @@ def analyze_pronoun(pronoun):
 
     return person, gender
 
-def from_gorgus(user_input: str):
+GORGUS_PUNCTUATION_TABLE = str.maketrans('', '', ".,?!$:()=/\\[]")
+
+def from_gorgus(user_input: str, inspect=True):
+    """Translate gorgus to english. Returns `(translation, inspection)`.
+
+    Building the inspection means tagging every word and writing up notes and morphology for it,
+    none of which changes the translation. Pass `inspect=False` to skip all that, the inspection will be `None`.
+    """
+    translator.warm_up()
+
+    with pipeline_timer.stage("from_gorgus"):
+        # Replace phrases with english words
+        with pipeline_timer.stage("from_gorgus.phrases"):
+            words = gorgus_phrase_matcher.replace(remove_all_except(user_input)).split(" ")
+
+        return translate_gorgus_words(user_input, words, inspect)
+
+def from_gorgus_many(user_inputs):
+    """Translate a list of gorgus texts to english (without inspecting them), replacing the phrases in all of them at once."""
+    translator.warm_up()
+
+    with pipeline_timer.stage("from_gorgus"):
+        with pipeline_timer.stage("from_gorgus.phrases"):
+            texts = replace_phrases(gorgus_phrase_matcher, [remove_all_except(user_input) for user_input in user_inputs])
+        return [translate_gorgus_words(user_input, text.split(" "), inspect=False)[0] for user_input, text in zip(user_inputs, texts)]
+
+def translate_gorgus_words(user_input, words, inspect):
+    """The rest of `from_gorgus`, once the phrases in `user_input` have been replaced and it's been split into `words`."""
+    translator.warm_up()
     translated = ""
     inspection = {
         "input": user_input,
@@ -743,22 +1285,15 @@ def from_gorgus(user_input: str):
         "morphology": []
     }
 
-    user_input = remove_all_except(user_input)
-
-    # Replace phrases with english words
-    for gorgus, english in phrase_translations.items():
-        if type(english) == list:
-            for phrase in english:
-                user_input = user_input.replace(remove_all_except(gorgus), english[0])
-        elif type(english) == str:
-            user_input = user_input.replace(remove_all_except(gorgus), english)
-
-    words = user_input.split(" ")
+    # words that still need their word type before we can finish inspecting them
+    untagged_words = []
 
     for word in words:
         if word == "lunk":
             translated = translated[:-1] + "? "
-            
+            if not inspect:
+                continue
+
             inspection["words"].append({
                 "word": "lunk",
                 "pos": "particle",
@@ -775,7 +1310,7 @@ def from_gorgus(user_input: str):
         trailing = get_trailing_punctuation(word, translation_dictionary["<EXAGGERATED_VERB>"] + translation_dictionary["<GENTLE_VERB>"] + translation_dictionary["<MORE_VERB>"] + translation_dictionary["<LESS_VERB>"])
         suffix += trailing
 
-        word = word.translate(str.maketrans('', '', ".,?!$:()=/\\[]"))
+        word = word.translate(GORGUS_PUNCTUATION_TABLE)
 
         # start creating the word's inspection
         current_words_inspection = {
@@ -787,104 +1322,49 @@ def from_gorgus(user_input: str):
 
         word_before_translation = word
 
-        plural = False
-        actor = False
-
-        tense = "norm"
-
-        # the suffixes and prefixes lists are used by the inspector
-        suffixes = []
-        prefixes = []
-
-        for tense_key, tense_value in {translation_dictionary["<CONT_TENSE>"]: "cont", translation_dictionary["<PAST_TENSE>"]: "past", translation_dictionary["<FUTR_TENSE>"]: "futr"}.items():
-            #if tense_key in word:
-            if word.endswith(tense_key):
-                #word = word.replace(tense_key, "")
-                word = word.removesuffix(tense_key)
-                tense = tense_value
-                suffixes.append(tense_key)
-
-                if tense != "cont":
-                    current_words_inspection["features"]["tense"] = tense
-                    inspection["notes"].append(
-                        f"The verb uses the {tense_value}-tense suffix \"{tense_key}\""
-                    )
-                else:
-                    current_words_inspection["features"]["aspect"] = "continuous"
-
-                break
-
-        if word.startswith(translation_dictionary["<PLURAL>"]):
-            word = word.removeprefix(translation_dictionary["<PLURAL>"])
-            prefixes.append(translation_dictionary["<PLURAL>"])
-            plural = True
-
-        if word.endswith(translation_dictionary["<ACTOR>"]):
-            word = word.removesuffix(translation_dictionary["<ACTOR>"])
-            suffixes.append(translation_dictionary["<ACTOR>"])
-            actor = True
-
-        uses_diacritic = False
-        if word.find(translation_dictionary["<EXAGGERATED_VERB>"]) != -1:
-            word = word.replace(translation_dictionary["<EXAGGERATED_VERB>"], "")
-            translated += "really "
-            current_words_inspection["features"]["intensity"] = "high"
-            inspection["morphology"].append(f"{word_before_translation} = {word} + {translation_dictionary['<EXAGGERATED_VERB>']}  (diacritic for intensified form)")
-            uses_diacritic = True
-        if word.find(translation_dictionary["<GENTLE_VERB>"]) != -1:
-            word = word.replace(translation_dictionary["<GENTLE_VERB>"], "")
-            translated += "slightly "
-            current_words_inspection["features"]["intensity"] = "low"
-            inspection["morphology"].append(f"{word_before_translation} = {word} + {translation_dictionary['<GENTLE_VERB>']}  (diacritic for reduced intensity form)")
-            uses_diacritic = True
-        if word.find(translation_dictionary["<MORE_VERB>"]) != -1:
-            word = word.replace(translation_dictionary["<MORE_VERB>"], "")
-            translated += "more "
-            current_words_inspection["features"]["intensity"] = "more"
-            current_words_inspection["features"]["comparative"] = True
-            inspection["morphology"].append(f"{word_before_translation} = {word} + {translation_dictionary['<MORE_VERB>']}  (diacritic for intensified comparative form)")
-            uses_diacritic = True
-        if word.find(translation_dictionary["<LESS_VERB>"]) != -1:
-            word = word.replace(translation_dictionary["<LESS_VERB>"], "")
-            translated += "less "
-            current_words_inspection["features"]["intensity"] = "less"
-            current_words_inspection["features"]["comparative"] = True
-            inspection["morphology"].append(f"{word_before_translation} = {word} + {translation_dictionary['<LESS_VERB>']}  (diacritic for reduced intensity comparative form)")
-            uses_diacritic = True
+        # split the word into its root and affixes
+        with pipeline_timer.stage("from_gorgus.affixes"):
+            analysis = analyze_gorgus_word(word)
+        tense = analysis.tense
+        plural = analysis.plural
+        actor = analysis.actor
+        prefixes = list(analysis.prefixes)
+        suffixes = list(analysis.suffixes)
+
+        if analysis.tense_suffix and inspect:
+            if tense != "cont":
+                current_words_inspection["features"]["tense"] = tense
+                inspection["notes"].append(
+                    f"The verb uses the {tense}-tense suffix \"{analysis.tense_suffix}\""
+                )
+            else:
+                current_words_inspection["features"]["aspect"] = "continuous"
+
+        uses_diacritic = len(analysis.diacritics) > 0
+        for diacritic, word_without_diacritic, english, intensity, description in analysis.diacritics:
+            translated += f"{english} "
+            if not inspect:
+                continue
+            current_words_inspection["features"]["intensity"] = intensity
+            if intensity in ["more", "less"]:
+                current_words_inspection["features"]["comparative"] = True
+            inspection["morphology"].append(f"{word_before_translation} = {word_without_diacritic} + {diacritic}  ({description})")
         
-        if uses_diacritic:
+        if uses_diacritic and inspect:
             inspection["notes"].append(
                 f"\"{word_before_translation}\" shows {'intensification' if current_words_inspection['features']['intensity'] in ['high', 'more'] else 'reduced intensification'} via diacritic"
             )
 
-        if word == "ji":
+        if analysis.stem == "ji":
             translated += "ji "
             continue
 
-        word_type_suffixes = [
-            translation_dictionary["<VERB>"],
-            translation_dictionary["<NOUN>"],
-            translation_dictionary["<ADJECTIVE>"],
-            translation_dictionary["<ADVERB>"],
-            translation_dictionary["<ADPOSITION>"]
-        ]
-        for word_type_suffix in word_type_suffixes:
-            if word.endswith(word_type_suffix) or word.endswith(remove_all_except(word_type_suffix)):
-                word = word.removesuffix(word_type_suffix).removesuffix(remove_all_except(word_type_suffix))
-
-                if len(suffixes) > 0: # we need to move the most recent suffix before the formality suffix in suffixes list for the inspect tool
-                    most_recent_suffix = suffixes.pop()
-                    suffixes.append(word_type_suffix)
-                    suffixes.append(most_recent_suffix)
-                else:
-                    suffixes.append(word_type_suffix)
-
-                break
-
+        word = analysis.root
         current_words_inspection["lemma"] = no_accent_to_accented.get(word.lower(), word)
 
         #return f'{word, translation_dictionary, translation_dictionary.get(word, " Not found!")}'
-        translation = deaccented_translation_dict.get(remove_all_except(word.lower()))
+        with pipeline_timer.stage("from_gorgus.lookup"):
+            translation = deaccented_translation_dict.get(remove_all_except(word.lower()))
     
         output_english = ""
         if translation:
@@ -894,99 +1374,122 @@ def from_gorgus(user_input: str):
                 final = to_actor_form(final)
 
             if plural:
-                final = inflect_engine.plural(final)
+                with pipeline_timer.stage("from_gorgus.inflect"):
+                    final = inflect_engine.plural(final)
 
             final = get_tense_verb(final, tense)
+            output_english = f"{final}{suffix} "
+            translated += output_english
+            if not inspect:
+                continue
+
             for word, features in word_features.items():
                 if final.lower() == word.lower():
                     current_words_inspection["features"].update(features)
 
-            output_english = f"{final}{suffix} "
-            word_type = get_word_type(output_english)
+            # the rest of the inspection needs the word type, which we only get once the whole sentence is tagged
+            morphology_index = None
+            if not uses_diacritic: # if the word has a diacritic, we have already handled its morphology
+                morphology_index = len(inspection["morphology"])
+                inspection["morphology"].append(None)
 
-            person_lookup = {
-                1: "first",
-                2: "second",
-                3: "third"
-            }
-            person, gender = analyze_pronoun(final) # only used if word is pronoun
-            if word_type == "PRONOUN":
-                current_words_inspection["features"]["Person"] = person
-                current_words_inspection["features"]["Gender"] = gender.capitalize()
+            untagged_words.append((current_words_inspection, output_english, final, actor, plural, tense, prefixes, suffixes, morphology_index))
+        else:
+            output_english = f"{word}{suffix} "
+            translated += output_english
+            if not inspect:
+                continue
 
-            # handle morphology inspection stuff
+            untagged_words.append((current_words_inspection, output_english, None, actor, plural, tense, prefixes, suffixes, None))
 
-            if not uses_diacritic: # if the word has a diacritic, we have already handled its morphology
-                morphology = f"{current_words_inspection['word']} = "
-                features = word_features.get(final.lower()) # some words have some manually added info to them
-                should_add_root_tag = not (actor or plural or tense != "norm") # is the word a root word?
-                if features: # does the word have extra info?
-                    if word_type != "DETERMINER":
-                        if should_add_root_tag:
-                            morphology += "[Root] "
+        inspection["words"].append(current_words_inspection)
+
+    # tag all of the english words at once, then finish inspecting them
+    word_types = get_word_types([output_english for _, output_english, *_ in untagged_words]) if untagged_words else []
+    with pipeline_timer.stage("from_gorgus.inspect"):
+        for (current_words_inspection, output_english, final, actor, plural, tense, prefixes, suffixes, morphology_index), word_type in zip(untagged_words, word_types):
+            if final is not None:
+                person_lookup = {
+                    1: "first",
+                    2: "second",
+                    3: "third"
+                }
+                person, gender = analyze_pronoun(final) # only used if word is pronoun
+                if word_type == "PRONOUN":
+                    current_words_inspection["features"]["Person"] = person
+                    current_words_inspection["features"]["Gender"] = gender.capitalize()
+
+                # handle morphology inspection stuff
+
+                if morphology_index is not None:
+                    morphology = f"{current_words_inspection['word']} = "
+                    features = word_features.get(final.lower()) # some words have some manually added info to them
+                    should_add_root_tag = not (actor or plural or tense != "norm") # is the word a root word?
+                    if features: # does the word have extra info?
+                        if word_type != "DETERMINER":
+                            if should_add_root_tag:
+                                morphology += "[Root] "
                         
                         
 
-                    possessive = features.get("possessive", "")
-                    if possessive:
-                        morphology += "possessive "
-                    else:
-                        morphology += "("
+                        possessive = features.get("possessive", "")
+                        if possessive:
+                            morphology += "possessive "
+                        else:
+                            morphology += "("
 
-                    morphology += word_type.lower()
+                        morphology += word_type.lower()
 
-                    if possessive:
-                        morphology += f" (\"{possessive.lower()}\")"
-                    else:
-                        morphology += ")"
+                        if possessive:
+                            morphology += f" (\"{possessive.lower()}\")"
+                        else:
+                            morphology += ")"
                     
                     
-                else: # word does not have extra info
-                    if should_add_root_tag: # word is a wroot word
-
-                        if word_type == "PRONOUN": # if the word is a pronoun, we add information about the person and gender of the pronoun in the morphology
-                            morphology += f"[Root] ({person_lookup[person]} person {gender} pronoun)"
-                        else: # it is just a regular root word
-                            morphology += f"[Root] (\"{final}\")" 
-                    else: # word is not a root word! let's see what suffixes and prefixes it has...
+                    else: # word does not have extra info
+                        if should_add_root_tag: # word is a wroot word
+
+                            if word_type == "PRONOUN": # if the word is a pronoun, we add information about the person and gender of the pronoun in the morphology
+                                morphology += f"[Root] ({person_lookup[person]} person {gender} pronoun)"
+                            else: # it is just a regular root word
+                                morphology += f"[Root] (\"{final}\")" 
+                        else: # word is not a root word! let's see what suffixes and prefixes it has...
                         
-                        entire_word = prefixes + [current_words_inspection["lemma"]] + suffixes
+                            entire_word = prefixes + [current_words_inspection["lemma"]] + suffixes
 
-                        morphology += ' + '.join(entire_word)
+                            morphology += ' + '.join(entire_word)
 
-                        for prefix in prefixes:
-                            morphology += f"\n    → Prefix: [red]-{prefix}[/red] (\"{modifier_info[prefix]}\")"
+                            for prefix in prefixes:
+                                morphology += f"\n    → Prefix: [red]-{prefix}[/red] (\"{modifier_info[prefix]}\")"
 
-                        morphology += f"\n    → Root: {current_words_inspection['lemma']} (\"{lemmatizer.lemmatize(final)}\")"
+                            morphology += f"\n    → Root: {current_words_inspection['lemma']} (\"{lemmatizer.lemmatize(final)}\")"
 
-                        for suffix in suffixes:
-                            morphology += f"\n    → Suffix: [red]-{suffix}[/red] (\"{modifier_info[suffix]}\")"
+                            for suffix in suffixes:
+                                morphology += f"\n    → Suffix: [red]-{suffix}[/red] (\"{modifier_info[suffix]}\")"
 
                     
-                inspection["morphology"].append(morphology)
-        else:
-            output_english = f"{word}{suffix} "
-            word_type = get_word_type(output_english)
-        translated += output_english
+                    inspection["morphology"][morphology_index] = morphology
 
-        current_words_inspection["pos"] = word_type.lower()
+            current_words_inspection["pos"] = word_type.lower()
         
-        # note generator
-        for rule in grammar_note_rules:
-            if rule["condition"](current_words_inspection): # does the word meet the rules?
-                if callable(rule["note"]):
-                    inspection["notes"].append(rule["note"](current_words_inspection))
-                else:
-                    inspection["notes"].append(rule["note"])
-        # end of note generator
-
-        inspection["words"].append(current_words_inspection)
+            # note generator
+            for rule in grammar_note_rules:
+                if rule["condition"](current_words_inspection): # does the word meet the rules?
+                    if callable(rule["note"]):
+                        inspection["notes"].append(rule["note"](current_words_inspection))
+                    else:
+                        inspection["notes"].append(rule["note"])
+            # end of note generator
             
-    translated = fix_articles(translated, "ji")
+    with pipeline_timer.stage("from_gorgus.fix_articles"):
+        translated = fix_articles(translated, "ji")
 
     #translated = swap_verbs_nouns(translated)
     #translated = remove_all_except(translated)
 
+    if not inspect:
+        return translated, None
+
     inspection["translation"] = translated # add translation to inspection
     inspection["notes"] = list(set(inspection["notes"])) # remove duplicate notes
 
@@ -1007,6 +1510,7 @@ def fix_up(translated, should_add_accents):
     return translated
 
 def fix_articles(input_string, article_word):
+    translator.warm_up()
     words = input_string.split()  # Split the string into words
     result = []
 
@@ -1027,70 +1531,255 @@ def replace_word(input_string, word, replacement, offset = 1):
     # Split the input string into words
     words = input_string.split()
 
-    # Check if 'very' comes before 'quickly'
-    thingy = 0 # i don't what to call this variable, we use this so that whenever we delete a word, we're still at the correct word or something idfk
+    # the words we've gone past, without the ones we removed. deleting them from `words` instead would mean
+    # shifting every word after them, which gets really slow on long texts with lots of modifiers
+    kept = []
 
+    # Check if 'very' comes before 'quickly'
     for i in range(len(words) - 1):
-        if words[i - thingy] == word and len(words) > i+1 - thingy:
-            if words[i+1 - thingy].lower() == "horge":
-                offset = min(offset+1, (len(words)-i)-1)
+        if words[i] != word:
+            kept.append(words[i])
+            continue
 
-            trailing = get_trailing_punctuation(words[i+offset-thingy])
-            len_trailing = len(trailing)
+        removed = i - len(kept)
+        if words[i + 1].lower() == "horge":
+            offset = min(offset + 1, (len(words) - removed - i) - 1)
 
-            # Modify 'quickly' by adding '\u0302' and remove 'very'
+        # where the word we're modifying is, counting from the start of the text without the removed words
+        target = len(kept) + offset
+        if target < 0:
+            target += len(words) - removed
 
-            if len_trailing > 0:
-                words[i + offset - thingy] = words[i + offset - thingy][:-len(trailing)] + replacement + trailing
-            else:
-                words[i + offset - thingy] = words[i + offset - thingy][:] + replacement
-            del words[i - thingy]  # Remove 'very'
+        # Modify 'quickly' by adding '\u0302' and remove 'very' (by not keeping it)
+        if target < len(kept):
+            kept[target] = add_modifier(kept[target], replacement)
+        else:
+            words[target - len(kept) + i] = add_modifier(words[target - len(kept) + i], replacement)
 
-            thingy += 1
+    if words:
+        kept.append(words[-1])
 
     # Join the words back into a string and return
-    return " ".join(words)
+    return " ".join(kept)
+
+def add_modifier(word, modifier):
+    """Add a modifier diacritic to the end of a word, before its trailing punctuation."""
+    trailing = get_trailing_punctuation(word)
+    if len(trailing) > 0:
+        return word[:-len(trailing)] + modifier + trailing
+    return word + modifier
+
+#region Translation cache
+# An optional cache of whole translations that gets saved to disk, so translating the same thing again is free, even after a restart.
+# Every entry is tied to a hash of translations.py, the code that translates and the tagger, so changing any of them throws away any out of date translations.
+# (the morphology table is built from those three, so it doesn't need hashing on its own)
+TRANSLATION_CACHE_FILE = "translation_cache.sqlite3"
+
+# the modules (next to this file) that decide what a translation turns out as
+TRANSLATION_CODE_FILES = ["translater.py", "affixes.py", "phrase_matcher.py", "util.py"]
+
+translation_cache = None
+
+def enable_translation_cache(path = None, max_size = 100_000):
+    """Start saving translations to an SQLite database at `path` (next to this file by default) and reusing them."""
+    global translation_cache
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), TRANSLATION_CACHE_FILE)
+
+    disable_translation_cache()
+    translation_cache = PersistentCache(path, get_translation_cache_namespace(), max_size)
+
+def get_translation_cache_namespace():
+    return f"{get_translations_hash()}:{get_translation_code_hash()}:{get_tagger_hash()}"
+
+def get_translation_code_hash():
+    """A hash of the code in `TRANSLATION_CODE_FILES`, so cached translations don't outlive changes to how we translate."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    code_hash = hashlib.sha256()
+    for file in TRANSLATION_CODE_FILES:
+        with open(os.path.join(directory, file), "rb") as f:
+            code_hash.update(f.read())
+    return code_hash.hexdigest()
+
+def disable_translation_cache():
+    """Stop using the translation cache, whatever is already saved in it is kept.
+
+    Another thread might still be translating with it, which is fine, a closed cache just doesn't find anything.
+    """
+    global translation_cache
+
+    if translation_cache is not None:
+        translation_cache.close()
+        translation_cache = None
+
+def get_cached_translations(cache, texts, translations, to, formal, should_add_accents):
+    """Put the translation of every text `cache` has into `translations`, returns the texts it didn't have."""
+    untranslated = []
+    for text in texts:
+        translated = cache.get([text, to, formal, should_add_accents])
+        if translated is not None:
+            translations[text] = translated
+        else:
+            untranslated.append(text)
+    return untranslated
+
+def get_translation_cache_stats():
+    """Get the hits, misses, evictions, etc. of the translation cache, or `None` if it isn't enabled."""
+    return translation_cache.stats() if translation_cache is not None else None
+#endregion
 
 def translate(text, to: Literal["english", "gorgus"], formal = True, should_add_accents = True):
     """Translate from or to Gorgus and English!
 
-    Trailing whitespace is not preserved, neither is punctuation.
+    Trailing whitespace is not preserved, neither is punctuation. The translator gets warmed up the first time this is called.
+    If the translation cache is enabled (see `enable_translation_cache`), translations get saved to and loaded from it.
     """
-    if text.strip() == "":
-        return ""
+    return translate_many([text], to, formal, should_add_accents)[0]
 
-    text = text.lower().strip()
-    text = text.replace("\n", " ")
+def translate_many(texts, to: Literal["english", "gorgus"], formal = True, should_add_accents = True, processes = None):
+    """Translate a lot of texts at once, returns a list with the translation of every text in the same order.
 
-    if to == "english":
-        user_choice = 2
-    elif to == "gorgus":
-        user_choice = 1
-    else:
+    Texts that are the same (after ignoring case and whitespace at the ends) only get translated once,
+    and the rest get translated together, so their phrases get replaced and their words get tagged in bulk.
+    Set `processes` to split the work between that many processes (see `start_translation_pool`).
+    """
+    texts = [text.lower().strip().replace("\n", " ") for text in texts]
+
+    if to not in ["english", "gorgus"] and any(text != "" for text in texts):
         raise TypeError("Invalid language conversion! Only options are \"english\" or \"gorgus\".")
 
-    if user_choice == 2: # translate language to english:
-            
-        translated, _ = from_gorgus(text)
+    translations = {"": ""}
+    untranslated = [text for text in dict.fromkeys(texts) if text not in translations]
 
-    elif user_choice == 1: # translate english to language      
-        
-        translated = to_gorgus(text, formal)
+    cache = translation_cache # so it can't get disabled by another thread halfway through
+    if cache is not None:
+        with pipeline_timer.stage("translate.cache"):
+            untranslated = get_cached_translations(cache, untranslated, translations, to, formal, should_add_accents)
 
-    translated = fix_up(translated, should_add_accents)
+    if untranslated and processes and processes > 1 and can_fork():
+        with start_translation_pool(processes) as pool:
+            chunk_size = max(1, min(256, len(untranslated) // (processes * 4)))
+            chunks = [untranslated[i:i + chunk_size] for i in range(0, len(untranslated), chunk_size)]
+            translated_chunks = pool.starmap(translate_many, [(chunk, to, formal, should_add_accents) for chunk in chunks])
 
-    return translated
+        for text, translated in zip(untranslated, (translated for chunk in translated_chunks for translated in chunk)):
+            translations[text] = translated
 
+            if cache is not None:
+                cache.put([text, to, formal, should_add_accents], translated)
+    elif untranslated:
+        if to == "english": # translate language to english:
+            translated_texts = from_gorgus_many(untranslated)
+        else: # translate english to language
+            translated_texts = to_gorgus_many(untranslated, formal)
 
-class TranslationTester(unittest.TestCase):
-    def test_translation_speed(self):
-        sentence = "The quick brown fox jumped over the lazy fat cat."
+        for text, translated in zip(untranslated, translated_texts):
+            with pipeline_timer.stage("translate.fix_up"):
+                translated = fix_up(translated, should_add_accents)
+            translations[text] = translated
+
+            if cache is not None:
+                cache.put([text, to, formal, should_add_accents], translated)
 
-        start = time()
-        to_gorgus(sentence, formal=True)
-        translation_time = time() - start
+    return [translations[text] for text in texts]
 
-        self.assertLess(translation_time, 0.1, f"Translation is too slow! ({round(translation_time,2)}s) Optimize your damn code!")
+
+#region Process pool
+# Translating is pure python, so one process only ever uses one core. A translation pool forks worker processes
+# after the translator has warmed up, so they share the dictionaries, phrase tables and tagger (copy-on-write)
+# instead of loading everything again. Platforms that can't fork (Windows) just translate in one process.
+
+def can_fork():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def forget_translation_cache():
+    """The SQLite connection belongs to the parent process, so workers leave the translation cache to it."""
+    global translation_cache
+    translation_cache = None
+
+def start_translation_pool(processes):
+    """Warm up the translator, then fork `processes` workers. Use it as a context manager to stop the workers."""
+    translator.warm_up()
+    return multiprocessing.get_context("fork").Pool(processes, initializer=forget_translation_cache)
+#endregion
+
+def translate_lines(lines, to: Literal["english", "gorgus"], formal = True, should_add_accents = True, processes = None, chunk_size = 256):
+    """Translate every line of an iterable of lines (like an open file).
+
+    This is a generator, so lines only get read when their translation is needed and huge files never have to fit in memory.
+    With `processes`, chunks of `chunk_size` lines get translated by a translation pool, and come back in the same order.
+    The workers leave the translation cache alone, so this process looks lines up in it and saves what the workers translated.
+    """
+    if not (processes and processes > 1 and can_fork()):
+        for line in lines:
+            yield translate(line, to, formal, should_add_accents)
+        return
+
+    def read_chunks():
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    cache = translation_cache
+
+    def start_chunk(pool, chunk):
+        texts = [text.lower().strip().replace("\n", " ") for text in chunk] # same as translate_many
+        translations = {"": ""}
+        untranslated = [text for text in dict.fromkeys(texts) if text not in translations]
+        if cache is not None:
+            untranslated = get_cached_translations(cache, untranslated, translations, to, formal, should_add_accents)
+
+        result = pool.apply_async(translate_many, (untranslated, to, formal, should_add_accents)) if untranslated else None
+        return texts, translations, untranslated, result
+
+    def finish_chunk(texts, translations, untranslated, result):
+        if result is not None:
+            for text, translated in zip(untranslated, result.get()):
+                translations[text] = translated
+                if cache is not None:
+                    cache.put([text, to, formal, should_add_accents], translated)
+        return [translations[text] for text in texts]
+
+    with start_translation_pool(processes) as pool:
+        # only keep a couple of chunks per worker in flight, so we don't read the whole file before it's translated
+        in_flight = deque()
+        for chunk in read_chunks():
+            in_flight.append(start_chunk(pool, chunk))
+            if len(in_flight) >= processes * 2:
+                yield from finish_chunk(*in_flight.popleft())
+
+        while in_flight:
+            yield from finish_chunk(*in_flight.popleft())
+
+def split_sentences(text):
+    """Split some text into sentences, after every ".", "?" or "!" that's followed by whitespace.
+
+    Returns `(sentences, separators)`, where `separators` is the whitespace between each sentence and the next one,
+    so `join_sentences` can put their translations back together the same way.
+    """
+    parts = re.split(r"(?<=[.?!])(\s+)", text)
+    return parts[0::2], parts[1::2]
+
+def join_sentences(sentences, separators):
+    return "".join(sentence + separator for sentence, separator in zip(sentences, separators + [""]))
+
+def count_sentences(text):
+    """Roughly count the sentences in some text, for throughput stats."""
+    if text.strip() == "":
+        return 0
+    return max(len(re.findall(r"[.?!]+(?=\s|$)", text)), 1)
+
+
+class TranslationTester(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        translator.warm_up()
 
     def test_tense_detection(self):
         # key = verb, value = expected tense
@@ -1119,6 +1808,194 @@ class TranslationTester(unittest.TestCase):
         for verb, expected_tense in tense_tests.items():
             self.assertEqual(detect_verb_tense(verb), expected_tense, f"Detected verb tense and expected verb tense do not match! ({verb})")
 
+    def test_phrase_matcher(self):
+        matcher = PhraseMatcher([("have not", "goov'ma"), ("i have", "glurple"), ("damn it", "jink"), ("damn", "jink")])
+
+        self.assertEqual(matcher.replace("i have not"), "i goov'ma", "Higher priority phrases should win overlaps!")
+        self.assertEqual(matcher.replace("damn it, i have"), "jink, glurple")
+        self.assertEqual(matcher.replace("I HAVE dammit"), "glurple dammit", "Phrases should only match whole words!")
+
+    def test_analysis_cache(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3) # "b" is the least recently used, so it goes
+
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 1))
+
+        # translating with a warm cache should give the same result as a cold one
+        sentence = "The teacher will eat the cats, the teacher ate."
+        analysis_cache.clear()
+        cold = to_gorgus(sentence)
+        self.assertEqual(to_gorgus(sentence), cold, "The analysis cache changed the translation!")
+        self.assertGreater(get_analysis_cache_stats()["hits"], 0)
+
+    def test_morphology_table(self):
+        # the precomputed analyses should be exactly what analysing the word at runtime gives us
+        forms = ["cats", "teacher", "ate", "eating", "dogs", "speakers", "loved"]
+        for form, tagged_form in zip(forms, tag_words(forms)):
+            if form not in morphology_table:
+                continue
+            fresh = finish_english_word_analysis(form, inflect_english_word(form), tagged_form, None, [])
+            self.assertEqual(morphology_table[form], fresh, f"The morphology table is out of date! ({form})")
+
+    def test_gorgus_affixes(self):
+        analysis = analyze_gorgus_word("ikshmackyatakra")
+        self.assertEqual(analysis.root, "shmack")
+        self.assertEqual((analysis.tense, analysis.plural, analysis.actor), ("past", True, True))
+        self.assertEqual(analysis.prefixes, ("ik",))
+        self.assertEqual(analysis.suffixes, ("ra", "yat", "ak"), "Affixes are in the wrong order for the inspector!")
+
+        analysis = analyze_gorgus_word("kithrark\u0302")
+        self.assertEqual((analysis.root, analysis.diacritics[0][3]), ("kithrark", "high"))
+
+    def test_translation_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "translation_cache.sqlite3")
+
+            enable_translation_cache(path)
+            cache = translation_cache
+            try:
+                translation = translate("I love you.", "gorgus", formal=False)
+                self.assertEqual(translate("I love you.", "gorgus", formal=False), translation)
+                self.assertEqual(get_translation_cache_stats()["hits"], 1)
+
+                # the workers of a translation pool can't use the cache, but what they translate should still end up in it
+                if can_fork():
+                    lines = ["Hi! How are you?", "I love you."]
+                    self.assertEqual(list(translate_lines(lines, "gorgus", formal=False, processes=2)), [translate(line, "gorgus", formal=False) for line in lines])
+                    self.assertIn(["hi! how are you?", "gorgus", False, True], cache)
+            finally:
+                disable_translation_cache()
+
+            # a thread that grabbed the cache before it got disabled should just miss
+            self.assertIsNone(cache.get(["I love you.", "gorgus", False, True]))
+            cache.put(["I love you.", "gorgus", False, True], translation)
+
+            # editing the dictionary changes the hash, which should throw away the old translations
+            cache = PersistentCache(path, "a different hash", max_size=2)
+            try:
+                self.assertEqual(len(cache), 0)
+
+                for i in range(3):
+                    cache.put(["sentence", i], str(i))
+                self.assertLessEqual(len(cache), 2)
+                self.assertEqual(cache.get(["sentence", 2]), "2", "The most recent translation was evicted!")
+            finally:
+                cache.close()
+
+    def test_pipeline_timings(self):
+        reset_pipeline_timings()
+        analysis_cache.clear() # so the words actually get tagged
+
+        enable_pipeline_timings()
+        try:
+            english = to_gorgus("The workers were eating slowly.")
+            from_gorgus(english)
+        finally:
+            disable_pipeline_timings()
+
+        timings = get_pipeline_timings()
+        for stage in ["to_gorgus", "to_gorgus.phrases", "to_gorgus.inflect", "tag.unigram", "from_gorgus", "from_gorgus.affixes", "from_gorgus.inspect"]:
+            self.assertIn(stage, timings)
+        self.assertEqual(timings["to_gorgus"]["calls"], 1)
+        self.assertLessEqual(timings["to_gorgus.phrases"]["total"], timings["to_gorgus"]["total"])
+
+        # nothing gets timed while it's disabled
+        to_gorgus("The workers were eating slowly.")
+        self.assertEqual(get_pipeline_timings(), timings)
+        reset_pipeline_timings()
+
+    def test_compact_tagger(self):
+        word_to_tag = {"cat": "NN", "Cat": "NP", "naïve": "JJ", "ran": "VBD", "a": "AT"}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tagger.bin")
+
+            save_compact_tagger(word_to_tag, path)
+            tagger = CompactTagger(path)
+            self.assertEqual(tagger.tag(list(word_to_tag) + ["dog"]), list(word_to_tag.items()) + [("dog", None)])
+
+            save_compact_tagger(word_to_tag, path, vocabulary={"cat", "ran"})
+            tagger = CompactTagger(path)
+            self.assertEqual(tagger.tag(["cat", "Cat", "ran"]), [("cat", "NN"), ("Cat", None), ("ran", "VBD")])
+
+            del tagger # windows won't let us delete a file that's still memory-mapped
+
+            # a file that didn't get written all the way shouldn't load
+            with open(path, "rb") as f:
+                data = f.read()
+            for length in [0, 10, len(data) - 1]:
+                with open(path, "wb") as f:
+                    f.write(data[:length])
+                with self.assertRaises(ValueError):
+                    CompactTagger(path)
+
+    def test_pruned_tagger(self):
+        global unigram_tagger
+
+        verbs = ["eat", "sat", "teaching", "rented", "will eat", "ate", "slept", "will explode", "was eating", "had slept"]
+        sentences = ["He slept.", "The teacher will eat the cats.", "They ate pizza!", "The workers were eating slowly and the dogs barked."]
+
+        def translate_everything():
+            analysis_cache.clear()
+            return [detect_verb_tense(verb) for verb in verbs], [to_gorgus(sentence) for sentence in sentences]
+
+        expected = translate_everything()
+        full_tagger = unigram_tagger
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tagger.bin")
+            word_to_tag = dict(full_tagger.items())
+            save_compact_tagger(word_to_tag, path, get_tagger_vocabulary(word_to_tag))
+
+            unigram_tagger = CompactTagger(path)
+            try:
+                self.assertLess(len(unigram_tagger), len(full_tagger))
+                self.assertEqual(translate_everything(), expected, "The pruned tagger should translate the same as the full one!")
+            finally:
+                unigram_tagger = full_tagger
+                analysis_cache.clear()
+
+    def test_tagger_training(self):
+        # "run" is a verb and a noun equally often, NLTK picks the tag it saw first
+        sentences = [[("I", "PPSS"), ("run", "VB")], [("a", "AT"), ("run", "NN"), ("run", "NN")], [("run", "VB")]]
+
+        counts = {}
+        for part in [sentences[:1], sentences[1:]]: # like counting two categories separately
+            unigram_tagger_model_trainer.merge_counts(counts, unigram_tagger_model_trainer.count_tags(part))
+
+        self.assertEqual(unigram_tagger_model_trainer.choose_tags(counts), nltk.UnigramTagger(sentences)._context_to_tag)
+
+    def test_translate_many(self):
+        texts = ["I love you.", "Hi! How are you?", "", "I LOVE YOU.", "What is going on?", "  I love you.\n"]
+        self.assertEqual(translate_many(texts, "gorgus", formal=False), [translate(text, "gorgus", formal=False) for text in texts])
+        self.assertEqual(translate_many(texts, "gorgus", formal=False, processes=2), [translate(text, "gorgus", formal=False) for text in texts])
+
+        texts = ["Googrung kiff!", "Toopyat!", "googrung kiff!"]
+        self.assertEqual(translate_many(texts, "english"), [translate(text, "english") for text in texts])
+
+    def test_translate_lines(self):
+        # translating a whole file line by line should give the same translations
+        lines = ["Hi! How are you?", "I love you.\n", "", "He slept.", "Toopyat!"]
+        self.assertEqual(list(translate_lines(lines, "gorgus", formal=False)), [translate(line, "gorgus", formal=False) for line in lines])
+
+    def test_split_sentences(self):
+        self.assertEqual(split_sentences("Hi! How are\nyou?\n\nGood."), (["Hi!", "How are\nyou?", "Good."], [" ", "\n\n"]))
+
+        # translating one sentence at a time should give the same translation as translating all of it
+        tests = {
+            "gorgus": ["I love you. How are you? I will. Eat the food.", "Hi! The workers were eating slowly. Very cool!"],
+            "english": ["Googrung kiff! Toopyat. Dink!"]
+        }
+        for to, texts in tests.items():
+            for text in texts:
+                sentences, separators = split_sentences(text)
+                self.assertEqual(join_sentences(translate_many(sentences, to), separators), translate(text, to))
+
     def test_to_gorgus(self):
         # key = english, value = expected gorgus translation
         tests_to_gorgus = {
@@ -1154,8 +2031,24 @@ class TranslationTester(unittest.TestCase):
         for gorgus, english in tests_from_gorgus.items():
             self.assertEqual(translate(gorgus, "english", formal=False), english, "Translation from Gorgus to English does not match!")
 
+    def test_from_gorgus_without_inspection(self):
+        # skipping the inspection should never change the translation
+        for gorgus in ["dink, dup pritterok lunk", "glonk chonġle̱ok migtir omnom!", "minġer goob'rung ji dagsâ dublub. :)", "ikshmack horge kithrark̂.", "nåck eepra"]:
+            translation, inspection = from_gorgus(gorgus)
+            self.assertIsNotNone(inspection)
+            self.assertEqual(from_gorgus(gorgus, inspect=False), (translation, None))
+
 
 if __name__ == "__main__":
+    # don't mix the loading messages into a translation that's being written to stdout
+    translator.warm_up(verbose=not (getattr(args, "file", None) and args.output_file is None))
+
+    if args.profile_startup:
+        startup_profiler.finish()
+        startup_profiler.print_report(Console(stderr=True))
+        if args.startup_report:
+            startup_profiler.save_report(args.startup_report)
+
     try: # the user executed a subcommand
         args.func(args)
     except AttributeError: # user didn't type anything ;-;
@@ -1,9 +1,36 @@
-import nltk
+import os
+import sys
+import gzip
+import json
 import time
+import argparse
+import subprocess
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 
-tagger_file = "brown_ngram_tagger_model.pkl"
+from compact_tagger import CompactTagger, save_compact_tagger
+
+tagger_file = "brown_unigram_tagger.bin"
+# how many times each word had each tag, so the tagger can be updated with more data without starting over
+counts_file = "brown_unigram_tagger_counts.json.gz"
+
+def get_tagger_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), tagger_file)
+
+def get_counts_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), counts_file)
+
+@contextmanager
+def stage(name):
+    """Print how long everything inside the `with` block took."""
+    print(f"{name}...")
+    start = time.perf_counter()
+    yield
+    print(f"{name} took {time.perf_counter() - start:.2f}s.")
 
 def nltk_download(packagePath, package) -> bool:
+    import nltk
+
     try:
         print(f"Checking for {package}...")
         nltk.data.find(packagePath)
@@ -25,6 +52,8 @@ def nltk_download(packagePath, package) -> bool:
         return download_success
 
 def generate_tagger():
+    import nltk
+
     print("Training tagger...")
     taggerStartTime = time.perf_counter_ns()
 
@@ -35,49 +64,176 @@ def generate_tagger():
 
     return unigram_tagger
 
+#region Parallel training
+# This trains exactly the same tagger as `generate_tagger`, but every Brown category gets counted in its own process.
+# A unigram tagger just picks the most common tag of every word. When two tags are equally common NLTK picks the one
+# it saw first, so counts are dictionaries in the order the tags were first seen, and get merged in corpus order.
+
+def count_tags(tagged_sents, counts = None):
+    """Count how many times each word has each tag. Returns `{word: {tag: count}}`."""
+    if counts is None:
+        counts = {}
+
+    for sentence in tagged_sents:
+        for word, tag in sentence:
+            tags = counts.setdefault(word, {})
+            tags[tag] = tags.get(tag, 0) + 1
+
+    return counts
+
+def merge_counts(counts, other_counts):
+    """Add `other_counts` into `counts`, tags that `counts` has never seen are treated as seen after the ones it has."""
+    for word, other_tags in other_counts.items():
+        tags = counts.setdefault(word, {})
+        for tag, count in other_tags.items():
+            tags[tag] = tags.get(tag, 0) + count
+
+    return counts
+
+def choose_tags(counts):
+    """Pick the most common tag for every word, just like `nltk.UnigramTagger` does."""
+    return {word: max(tags, key=tags.get) for word, tags in counts.items()}
+
+def count_brown_category(category):
+    import nltk
+    return count_tags(nltk.corpus.brown.tagged_sents(categories=category))
+
+def count_tagged_file(path):
+    """Count a file of extra training data. Every line is a sentence, where every word looks like "word/TAG"."""
+    import nltk
+
+    with open(path, "r", encoding="utf-8") as f:
+        return count_tags([nltk.tag.str2tuple(token) for token in line.split()] for line in f if line.strip())
+
+def count_in_parallel(function, jobs, workers = None):
+    """Run `function` on every job in a process pool, then merge all the counts in the same order as `jobs`."""
+    with stage(f"Counting {len(jobs)} parts with {workers or os.cpu_count()} processes"):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            all_counts = list(executor.map(function, jobs))
+
+    with stage("Merging counts"):
+        counts = {}
+        for other_counts in all_counts:
+            merge_counts(counts, other_counts)
+
+    return counts
+
+def train_tagger_in_parallel(workers = None):
+    """Count the Brown corpus one category at a time in a process pool. Returns the counts."""
+    import nltk
+
+    brown = nltk.corpus.brown
+    # NLTK goes through the corpus file by file, so this keeps the categories in the same order it would see them
+    categories = sorted(brown.categories(), key=lambda category: brown.fileids(categories=category)[0])
+
+    return count_in_parallel(count_brown_category, categories, workers)
+
+def save_counts(counts):
+    with stage("Saving counts"):
+        temporary_path = get_counts_path() + ".tmp"
+        with gzip.open(temporary_path, "wt", encoding="utf-8") as f:
+            json.dump(counts, f, ensure_ascii=False) # json keeps the order of the tags
+        os.replace(temporary_path, get_counts_path())
+
+def load_counts():
+    with stage("Loading counts"):
+        with gzip.open(get_counts_path(), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+def save_tagger_from_counts(counts, vocabulary = None):
+    with stage("Choosing the most common tags"):
+        word_to_tag = choose_tags(counts)
+
+    with stage("Saving tagger"):
+        save_compact_tagger(word_to_tag, get_tagger_path(), vocabulary)
+
+    return word_to_tag
+#endregion
+
 def import_tagger():
+    """Load the saved tagger, returns `None` if there isn't one (or if it's broken, in which case it gets deleted)."""
     try:
-        import dill
-        import os
-
-        # noinspection PyBroadException
-        #try:
-        with open(f'{os.path.dirname(__file__)}/{tagger_file}', 'rb') as fin:
-            return dill.load(fin)
-    # pickling doesn't work in the WASM version of CPython, prevent dill loading errors from borking the web translator.
-    #     ~ HSI
-    except ModuleNotFoundError:
+        return CompactTagger(get_tagger_path())
+    except FileNotFoundError:
+        return None
+    except ValueError as e: # like an empty or half written file
+        print(f"The saved tagger is broken ({e}), deleting it...", file=sys.stderr)
+        os.remove(get_tagger_path())
         return None
-    #except:
-        #return None
 
-def get_tagger_and_train_if_not_found():
+def get_tagger_and_train_if_not_found(log = print):
     tagger = import_tagger()
 
     if tagger is None:
-        print("Tagger not found, training...")
+        # training progress goes to stderr, stdout might be a translation that's being piped somewhere
+        print("Tagger not found, training...", file=sys.stderr)
+
+        try:
+            # training in its own process lets it use a process pool without re-running whatever script started us
+            subprocess.run([sys.executable, os.path.abspath(__file__)], check=True, stdout=sys.stderr)
+        except (OSError, subprocess.CalledProcessError): # can't start processes, just train it here
+            with redirect_stdout(sys.stderr):
+                save_compact_tagger(generate_tagger()._context_to_tag, get_tagger_path())
 
-        tagger = generate_tagger()
+        tagger = import_tagger()
     else:
-        print("Tagger found!")
+        log("Tagger found!")
 
     return tagger
 
-def main():
+def load_pickled_tagger(path):
+    """Load a tagger that was saved by an older version of this script, which used dill."""
     import dill
-    import os
 
-    brown_download_success = nltk_download("corpora/brown.zip", "brown")
-    if not brown_download_success:
-        print("Failed to download the Brown corpus - which is required for training. You will need to download it manually.")
+    with open(path, 'rb') as fin:
+        return dill.load(fin)
 
-    unigram_tagger = generate_tagger()
+def main():
+    arg_parser = argparse.ArgumentParser(description="Train the unigram tagger the translator uses and save it in the compact tagger format")
+    arg_parser.add_argument("--workers", type=int, help="How many processes to count with (defaults to the number of CPUs)")
+    arg_parser.add_argument("--serial", action="store_true", help="Train in this process only, the slow way")
+    arg_parser.add_argument("--update", nargs="+", metavar="FILE", help="Add extra training data (one sentence per line, \"word/TAG\" tokens) to the existing tagger instead of training from scratch")
+    arg_parser.add_argument("--from-pickle", metavar="PATH", help="Convert a tagger saved by an older version of the translator (needs dill) instead of training a new one")
+    arg_parser.add_argument("--prune", action="store_true", help="Only keep the words the translator can actually translate, makes the file a lot smaller")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+
+    if args.from_pickle:
+        with stage("Loading pickled tagger"):
+            word_to_tag = load_pickled_tagger(args.from_pickle)._context_to_tag
+        with stage("Saving tagger"):
+            save_compact_tagger(word_to_tag, get_tagger_path())
+    elif args.update:
+        if not os.path.isfile(get_counts_path()):
+            print(f"Can't update the tagger without {counts_file}, train it from scratch first!")
+            exit(1)
+
+        counts = merge_counts(load_counts(), count_in_parallel(count_tagged_file, args.update, args.workers))
+        save_counts(counts)
+        word_to_tag = save_tagger_from_counts(counts)
+    else:
+        with stage("Checking for the Brown corpus"):
+            brown_download_success = nltk_download("corpora/brown.zip", "brown")
+        if not brown_download_success:
+            print("Failed to download the Brown corpus - which is required for training. You will need to download it manually.")
+
+        if args.serial:
+            word_to_tag = generate_tagger()._context_to_tag
+            with stage("Saving tagger"):
+                save_compact_tagger(word_to_tag, get_tagger_path())
+        else:
+            counts = train_tagger_in_parallel(args.workers)
+            save_counts(counts)
+            word_to_tag = save_tagger_from_counts(counts)
 
-    print("Saving tagger...")
-    with open(f'{os.path.dirname(__file__)}/{tagger_file}', 'wb') as fout:
-        dill.dump(unigram_tagger, fout)
+    if args.prune:
+        with stage("Pruning tagger"):
+            import translater # the translator needs a tagger to warm up, which is why the full one gets saved first
+            translater.translator.warm_up()
+            save_compact_tagger(word_to_tag, get_tagger_path(), translater.get_tagger_vocabulary(word_to_tag))
 
-    print("Complete!")
+    print(f"Complete! Saved {len(import_tagger())} words to {tagger_file} in {time.perf_counter() - start:.2f}s.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
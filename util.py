@@ -3,34 +3,179 @@
 #
 import os
 import json
+import atexit
+import unicodedata
+from time import monotonic
+from threading import Lock, RLock, Timer
 
 
+SETTINGS_FILE = "settings.json"
+
+DEFAULT_SETTINGS = {
+    "check_updates_on_start": True,
+    "theme": "textual-dark",
+    "theme_index": 0,
+    "clock_enabled": True,
+    "add_pronounciation_accents": True,
+    "show_ipa": True,
+    "formal_gorgus": False,
+    "persistent_translation_cache": False
+}
+
+
+class JSONStore:
+    """A JSON file (holding an object) that gets loaded once and then read from memory.
+
+    Changes are written back `write_delay` seconds after the last one, all at once, by writing a temporary
+    file and renaming it over the real one (so the file is never half written). If someone else edits the
+    file, that gets noticed (checking at most every `check_interval` seconds) and it's loaded again.
+    """
+
+    def __init__(self, path, defaults = None, write_delay = 0.5, check_interval = 1.0):
+        self.path = path
+        self.defaults = defaults
+        self.write_delay = write_delay
+        self.check_interval = check_interval
+        self.lock = RLock() # the app reads settings from worker threads
+
+        self.data = None
+        self.mtime = None
+        self.last_checked = 0
+        self.pending = {} # changes that haven't been written yet
+        self.timer = None
+
+    def _get_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_if_changed(self):
+        now = monotonic()
+        if self.data is not None and now - self.last_checked < self.check_interval:
+            return
+        self.last_checked = now
+
+        mtime = self._get_mtime()
+        if self.data is not None and mtime == self.mtime:
+            return
+
+        if mtime is None: # no file (anymore), start with the defaults and save them, keeping any changes we haven't written yet
+            data = dict(self.defaults or {})
+            data.update(self.pending)
+            self.data = data
+            self.mtime = None
+            self.pending.update(data)
+            self._schedule_write()
+            return
+
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except ValueError: # probably someone in the middle of saving it, try again later
+            if self.data is None:
+                raise
+            return
+
+        # changes we haven't written yet win over whatever is in the file
+        data.update(self.pending)
+        self.data = data
+        self.mtime = mtime
+
+    def get(self):
+        """A copy of everything in the file."""
+        with self.lock:
+            self._load_if_changed()
+            return dict(self.data)
+
+    def set(self, key, value):
+        with self.lock:
+            self._load_if_changed()
+            self.data[key] = value
+            self.pending[key] = value
+            self._schedule_write()
+
+    def _schedule_write(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = Timer(self.write_delay, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        """Write any changes to the file right now."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending:
+                return
+
+            temporary_path = self.path + ".tmp"
+            with open(temporary_path, "w") as file:
+                json.dump(self.data, file, indent=4)
+            os.replace(temporary_path, self.path)
+
+            self.pending.clear()
+            self.mtime = self._get_mtime()
+
+    def delete(self):
+        """Delete the file and forget everything (including unsaved changes), the next read starts from the defaults again."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.pending.clear()
+            self.data = None
+
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+
+
+json_stores = {}
+json_stores_lock = Lock()
+
+def get_json_store(file_path):
+    """Get the `JSONStore` for a file, there's only ever one per file so everything sees the same data.
+
+    If the settings file doesn't exist, it starts off with the default settings.
+    """
+    key = os.path.abspath(file_path)
+    with json_stores_lock:
+        if key not in json_stores:
+            defaults = DEFAULT_SETTINGS if key == os.path.abspath(SETTINGS_FILE) else None
+            json_stores[key] = JSONStore(file_path, defaults)
+        return json_stores[key]
+
+@atexit.register
+def flush_json_stores():
+    """Write every unsaved change, so nothing is lost when the app closes."""
+    with json_stores_lock:
+        stores = list(json_stores.values())
+    for store in stores:
+        store.flush()
+
 def get_settings():
-    if not os.path.isfile("settings.json"):
-        initial_data = {
-            "check_updates_on_start": True,
-            "theme": "textual-dark",
-            "theme_index": 0,
-            "clock_enabled": True,
-            "add_pronounciation_accents": True,
-            "show_ipa": True,
-            "formal_gorgus": False
-        }
-        with open("settings.json", "w") as file:
-            json.dump(initial_data, file, indent=4)
-        return initial_data
-    else:
-        with open("settings.json", "r") as file:
-            return json.load(file)
-        
+    return get_json_store(SETTINGS_FILE).get()
+
+def reset_settings():
+    """Go back to the default settings."""
+    get_json_store(SETTINGS_FILE).delete()
+
 def modify_json(file_path, key, value):
-    # Open the file and load its current data
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-    
-    # Modify or add the key-value pair
-    data[key] = value
+    # the change gets written to the file a moment later, along with any other changes made before then
+    get_json_store(file_path).set(key, value)
 
-    # Write the updated data back to the JSON file
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
\ No newline at end of file
+def remove_all_except(text, accents_to_keep = {'\u0302', '\u0303', '\u0310', "\u0306"}):
+    """
+    Removes all diacritical marks except those in `accents_to_keep`.
+    
+    :param text: The input string containing diacritical marks.
+    :param accents_to_keep: A set of Unicode characters representing the accents to keep.
+    :return: The cleaned text with only the specified accents retained.
+    """
+    # Normalize text to decomposed form (NFD)
+    normalized_text = unicodedata.normalize('NFD', text)
+    # Keep only base characters and the specified accents
+    cleaned_text = ''.join(c for c in normalized_text if unicodedata.category(c) != 'Mn' or c in accents_to_keep)
+    return cleaned_text
@@ -0,0 +1,114 @@
+from rich.segment import Segment
+from rich.text import Text
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+
+class VirtualTable(ScrollView, can_focus=True):
+    """A read-only table that can show millions of rows, because it only ever renders the rows on screen.
+
+    Give it the keys of every row and a function that turns a key into a row (a tuple of cells, either `Text`
+    or markup strings) with `set_rows`. The scrollbar covers every row, but `render_row` only gets called
+    for the rows that are being drawn, and nothing is kept around for the rows that aren't.
+    """
+
+    DEFAULT_CSS = """
+    VirtualTable {
+        background: $surface;
+        color: $foreground;
+
+        &:focus {
+            background-tint: $foreground 5%;
+        }
+
+        & > .virtual-table--header {
+            text-style: bold;
+            background: $panel;
+            color: $foreground;
+        }
+    }
+    """
+
+    COMPONENT_CLASSES = {"virtual-table--header"}
+
+    CELL_PADDING = 1
+
+    # how many rows to look at when working out how wide the columns should be
+    MEASURE_ROWS = 200
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.columns = []
+        self.column_widths = []
+        self.row_keys = []
+        self.render_row = None
+
+    def add_columns(self, *labels):
+        self.columns.extend(Text.from_markup(label) for label in labels)
+        self.column_widths.extend(label.cell_len for label in self.columns[len(self.column_widths):])
+        self._update_virtual_size()
+
+    @property
+    def row_count(self):
+        return len(self.row_keys)
+
+    def get_row_at(self, index):
+        return tuple(Text.from_markup(cell) if isinstance(cell, str) else cell for cell in self.render_row(self.row_keys[index]))
+
+    def set_rows(self, row_keys, render_row):
+        """Replace every row in the table and scroll back to the top."""
+        self.row_keys = row_keys
+        self.render_row = render_row
+
+        self.column_widths = [label.cell_len for label in self.columns]
+        for index in range(min(len(row_keys), self.MEASURE_ROWS)):
+            self._measure_row(self.get_row_at(index))
+
+        self._update_virtual_size()
+        self.scroll_to(0, 0, animate=False)
+        self.refresh()
+
+    def _measure_row(self, row):
+        """Make the columns wide enough for `row`, returns whether any of them had to get wider."""
+        wider = False
+        for column, cell in enumerate(row[:len(self.column_widths)]):
+            if cell.cell_len > self.column_widths[column]:
+                self.column_widths[column] = cell.cell_len
+                wider = True
+        return wider
+
+    def _update_virtual_size(self):
+        width = sum(self.column_widths) + self.CELL_PADDING * 2 * len(self.column_widths)
+        self.virtual_size = Size(width, len(self.row_keys) + 1) # + 1 for the header
+
+    def _render_cells(self, cells, style):
+        segments = []
+        padding = Segment(" " * self.CELL_PADDING, style)
+        for cell, width in zip(cells, self.column_widths):
+            cell = cell.copy()
+            cell.truncate(width, overflow="ellipsis", pad=True)
+            segments.append(padding)
+            segments.extend(Segment(segment.text, style + segment.style if segment.style else style) for segment in cell.render(self.app.console))
+            segments.append(padding)
+        return Strip(segments)
+
+    def render_line(self, y):
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        base_style = self.rich_style
+
+        if y == 0: # the header stays at the top
+            style = self.get_component_rich_style("virtual-table--header")
+            return self._render_cells(self.columns, style).crop(scroll_x, scroll_x + width).extend_cell_length(width, style)
+
+        index = scroll_y + y - 1
+        if index >= len(self.row_keys):
+            return Strip.blank(width, base_style)
+
+        row = self.get_row_at(index)
+        if self._measure_row(row): # draw it again once this frame is done, with the wider columns
+            self._update_virtual_size()
+            self.call_after_refresh(self.refresh)
+
+        return self._render_cells(row, base_style).crop(scroll_x, scroll_x + width).extend_cell_length(width, base_style)